@@ -0,0 +1,107 @@
+# admission.py - GEMINI-BOUND KAAM KE LIYE ADMISSION CONTROL / LOAD SHEDDING
+from collections import deque
+from fastapi import HTTPException, status
+import os
+import threading
+import time
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "16"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+
+class _Waiter:
+    def __init__(self, lock):
+        self.cond = threading.Condition(lock)
+        self.granted = False
+
+class AdmissionController:
+    """
+    Ek saath sirf max_concurrent requests generation path mein jayengi.
+    Baaki bounded FIFO queue mein deadline tak wait karengi; queue full ho ya
+    deadline nikal jaye to turant 503 + Retry-After return hoga.
+    release() free slot seedha queue ke sabse purane waiter ko deta hai.
+    """
+
+    def __init__(self, max_concurrent, max_queue, queue_timeout):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters = deque()
+        self._admitted = 0
+        self._rejected_queue_full = 0
+        self._rejected_timeout = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _reject(self, reason):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server abhi busy hai ({reason}). Thodi der baad try karein.",
+            headers={"Retry-After": str(max(1, int(self.queue_timeout)))},
+        )
+
+    def acquire(self):
+        start = time.monotonic()
+        with self._lock:
+            # Queue mein pehle se log hain to naya request line todke nahi jayega
+            if self._in_flight >= self.max_concurrent or self._waiters:
+                if len(self._waiters) >= self.max_queue:
+                    self._rejected_queue_full += 1
+                    self._reject("queue full")
+
+                waiter = _Waiter(self._lock)
+                self._waiters.append(waiter)
+                deadline = start + self.queue_timeout
+                while not waiter.granted:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._waiters.remove(waiter)
+                        self._rejected_timeout += 1
+                        self._reject("queue timeout")
+                    waiter.cond.wait(remaining)
+                # release() ne apna slot seedha is waiter ko diya - in_flight pehle se gina hua
+            else:
+                self._in_flight += 1
+
+            waited = time.monotonic() - start
+            self._admitted += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                waiter.cond.notify()
+            else:
+                self._in_flight -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "queue_timeout_seconds": self.queue_timeout,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._waiters),
+                "admitted": self._admitted,
+                "rejected_queue_full": self._rejected_queue_full,
+                "rejected_timeout": self._rejected_timeout,
+                "avg_wait_ms": round(self._total_wait / self._admitted * 1000, 2) if self._admitted else 0,
+                "max_wait_ms": round(self._max_wait * 1000, 2),
+            }
+
+llm_admission = AdmissionController(LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT)
+
+def llm_slot():
+    """
+    FastAPI dependency - generation endpoints isko Depends() se use karte hain
+    """
+    llm_admission.acquire()
+    try:
+        yield
+    finally:
+        llm_admission.release()
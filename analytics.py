@@ -0,0 +1,184 @@
+# analytics.py - CLASS-WIDE TEACHER REPORTS (VECTORIZED, NUMPY)
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+import numpy as np
+import os
+import threading
+import time
+
+import models
+from stats import SAMPLE_QUESTION_PREFIX
+
+ANALYTICS_SNAPSHOT_TTL = int(os.getenv("ANALYTICS_SNAPSHOT_TTL", "300"))
+LOAD_CHUNK_ROWS = 100000
+SCORE_BINS = np.arange(0, 101, 10)  # 0-10, 10-20 ... 90-100
+PERCENTILES = (25, 50, 75, 90)
+
+# ---- bulk column loading ----
+def _load_columns(db: Session, statement, dtypes):
+    """
+    Query ke columns ko chunks mein NumPy arrays mein load karta hai -
+    ORM objects kabhi nahi bante.
+    """
+    chunks = [[] for _ in dtypes]
+    result = db.execute(statement.execution_options(yield_per=LOAD_CHUNK_ROWS))
+    for partition in result.partitions():
+        columns = list(zip(*partition))
+        for i, dtype in enumerate(dtypes):
+            chunks[i].append(np.asarray(columns[i], dtype=dtype))
+    return [
+        np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        for parts, dtype in zip(chunks, dtypes)
+    ]
+
+class ClassSnapshot:
+    """
+    Ek (class, subject) ka columnar snapshot - attempts ke arrays aur
+    question_stats ke class-wide per-question counters.
+    """
+
+    def __init__(self, attempt_chapter, attempt_score, attempt_time,
+                 question_chapter, question_id, question_attempts, question_corrects):
+        self.attempt_chapter = attempt_chapter
+        self.attempt_score = attempt_score
+        self.attempt_time = attempt_time
+        self.question_chapter = question_chapter
+        self.question_id = question_id
+        self.question_attempts = question_attempts
+        self.question_corrects = question_corrects
+        self.loaded_at = time.time()
+
+def load_class_snapshot(db: Session, class_level: int, subject: str):
+    qa = models.QuizAttempt
+    qs = models.QuestionStat
+    attempt_chapter, attempt_score, attempt_time = _load_columns(
+        db,
+        select(qa.chapter, qa.score_percentage, qa.time_taken).where(
+            qa.class_level == class_level, qa.subject == subject
+        ),
+        (np.int32, np.float64, np.float64)
+    )
+    # StudentResponse.question_id har user ki apni question_history row hai -
+    # class-wide identity question_stats (question_hash) se aati hai
+    question_chapter, question_id, question_attempts, question_corrects = _load_columns(
+        db,
+        select(qs.chapter, qs.id, qs.attempts, qs.corrects).where(
+            qs.class_level == class_level, qs.subject == subject,
+            ~qs.question_text.startswith(SAMPLE_QUESTION_PREFIX)
+        ),
+        (np.int32, np.int64, np.int64, np.int64)
+    )
+    return ClassSnapshot(attempt_chapter, attempt_score, attempt_time,
+                         question_chapter, question_id, question_attempts, question_corrects)
+
+_snapshot_lock = threading.Lock()
+_snapshots = {}  # (class_level, subject) -> ClassSnapshot
+
+def get_class_snapshot(db: Session, class_level: int, subject: str):
+    """TTL tak cached snapshot; purana ho to DB se dobara bulk load"""
+    key = (class_level, subject)
+    with _snapshot_lock:
+        snapshot = _snapshots.get(key)
+    if snapshot is None or time.time() - snapshot.loaded_at > ANALYTICS_SNAPSHOT_TTL:
+        snapshot = load_class_snapshot(db, class_level, subject)
+        with _snapshot_lock:
+            _snapshots[key] = snapshot
+    return snapshot
+
+# ---- vectorized aggregates (sirf arrays par, DB ke bina bhi chal sakte hain) ----
+def _grouped_percentiles(groups, values, percentiles=PERCENTILES):
+    """
+    Groups ko sort karke boundaries par split - har group ke percentiles.
+    Returns (unique_groups, array[len(groups), len(percentiles)])
+    """
+    if values.size == 0:
+        return np.empty(0, dtype=groups.dtype), np.empty((0, len(percentiles)))
+    order = np.lexsort((values, groups))
+    sorted_groups = groups[order]
+    sorted_values = values[order]
+    unique, starts, counts = np.unique(sorted_groups, return_index=True, return_counts=True)
+    # Linear interpolation percentile, sorted data par seedha index se
+    q = np.asarray(percentiles, dtype=np.float64) / 100.0
+    positions = starts[:, None] + q[None, :] * (counts[:, None] - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    frac = positions - lower
+    result = sorted_values[lower] * (1 - frac) + sorted_values[upper] * frac
+    return unique, result
+
+def score_distribution(chapters, scores):
+    """Per chapter: attempts, mean, percentiles aur 10-point histogram"""
+    if scores.size == 0:
+        return []
+    unique, inverse = np.unique(chapters, return_inverse=True)
+    counts = np.bincount(inverse)
+    means = np.bincount(inverse, weights=scores) / counts
+    bins = np.clip(np.digitize(scores, SCORE_BINS[1:-1]), 0, len(SCORE_BINS) - 2)
+    nbins = len(SCORE_BINS) - 1
+    histogram = np.bincount(inverse * nbins + bins, minlength=len(unique) * nbins).reshape(len(unique), nbins)
+    _, pct = _grouped_percentiles(chapters, scores)
+
+    return [{
+        "chapter": int(unique[i]),
+        "attempts": int(counts[i]),
+        "mean_score": round(float(means[i]), 2),
+        "percentiles": {f"p{p}": round(float(pct[i, j]), 2) for j, p in enumerate(PERCENTILES)},
+        "histogram": [
+            {"range": f"{int(SCORE_BINS[b])}-{int(SCORE_BINS[b + 1])}", "count": int(histogram[i, b])}
+            for b in range(nbins)
+        ]
+    } for i in range(len(unique))]
+
+def time_percentiles(chapters, times):
+    unique, pct = _grouped_percentiles(chapters, times)
+    return [{
+        "chapter": int(unique[i]),
+        **{f"p{p}": round(float(pct[i, j]), 1) for j, p in enumerate(PERCENTILES)}
+    } for i in range(len(unique))]
+
+def question_success_rates(question_ids, attempts, corrects, min_attempts=1, limit=20):
+    """Per-question counters se success rate; sabse mushkil (kam success) pehle"""
+    eligible = np.nonzero(attempts >= max(1, min_attempts))[0]
+    if eligible.size == 0:
+        return []
+    rates = corrects[eligible] / attempts[eligible]
+    order = np.argsort(rates, kind="stable")[:limit]
+    return [{
+        "question_id": int(question_ids[eligible[i]]),
+        "attempts": int(attempts[eligible[i]]),
+        "success_rate": round(float(rates[i]) * 100, 2)
+    } for i in order]
+
+def class_report(db: Session, class_level: int, subject: str, chapter: int = None,
+                 min_attempts: int = 5, limit: int = 20):
+    snapshot = get_class_snapshot(db, class_level, subject)
+
+    question_id = snapshot.question_id
+    question_attempts = snapshot.question_attempts
+    question_corrects = snapshot.question_corrects
+    if chapter is not None:
+        mask = snapshot.question_chapter == chapter
+        question_id = question_id[mask]
+        question_attempts = question_attempts[mask]
+        question_corrects = question_corrects[mask]
+
+    hardest = question_success_rates(question_id, question_attempts, question_corrects, min_attempts, limit)
+    if hardest:
+        ids = [q["question_id"] for q in hardest]
+        # Text bhi question_stats se - question_history retention mein archive ho jati hai
+        texts = dict(db.query(models.QuestionStat.id, models.QuestionStat.question_text).filter(
+            models.QuestionStat.id.in_(ids)
+        ).all())
+        for q in hardest:
+            q["question"] = texts.get(q["question_id"])
+
+    return {
+        "class_level": class_level,
+        "subject": subject,
+        "snapshot_age_seconds": round(time.time() - snapshot.loaded_at, 1),
+        "total_attempts": int(snapshot.attempt_score.size),
+        "total_responses": int(snapshot.question_attempts.sum()),
+        "score_distribution": score_distribution(snapshot.attempt_chapter, snapshot.attempt_score),
+        "time_taken_percentiles": time_percentiles(snapshot.attempt_chapter, snapshot.attempt_time),
+        "hardest_questions": hardest
+    }
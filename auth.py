@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
+import hmac
 import os
 import database
 import models
@@ -105,3 +106,12 @@ def get_token_info(token: str):
             "error": token_result["error"],
             "message": "Token is invalid"
         }
+
+# ✅ ADMIN TOKEN (exports / profiling jaise operator features ke liye)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def is_admin_token(token):
+    """X-Admin-Token header check - ADMIN_TOKEN set na ho to hamesha False"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token, ADMIN_TOKEN)
@@ -0,0 +1,76 @@
+# bench_analytics.py - CLASS ANALYTICS: VECTORIZED vs ROW-BY-ROW BENCHMARK
+# Run: DATABASE_URL=sqlite:// python bench_analytics.py [responses]
+from collections import defaultdict
+import sys
+import time
+
+import numpy as np
+
+from analytics import score_distribution, time_percentiles, question_success_rates
+
+def synthetic_class(responses, questions_per_quiz=25, chapters=16, chapter_pool=400, seed=7):
+    """
+    Real shape jaisa data: har response ka question_id alag question_history row hai
+    (har user ke liye generate hota hai), class-wide identity question_stats row hai
+    jo us chapter ke pool se aati hai.
+    """
+    rng = np.random.default_rng(seed)
+    attempts = responses // questions_per_quiz
+    responses = attempts * questions_per_quiz
+    attempt_chapter = rng.integers(1, chapters + 1, attempts, dtype=np.int32)
+    attempt_score = np.round(np.clip(rng.normal(62, 18, attempts), 0, 100), 2)
+    attempt_time = rng.gamma(4, 90, attempts)
+
+    response_chapter = np.repeat(attempt_chapter, questions_per_quiz)
+    response_history_id = np.arange(1, responses + 1, dtype=np.int64)
+    response_stat_id = (response_chapter.astype(np.int64) - 1) * chapter_pool + rng.integers(0, chapter_pool, responses)
+    difficulty = rng.uniform(0.2, 0.95, chapters * chapter_pool)
+    response_correct = (rng.random(responses) < difficulty[response_stat_id]).astype(np.int8)
+    responses_table = (response_chapter, response_history_id, response_stat_id, response_correct)
+
+    # question_stats - submit par incrementally bante hain, report sirf inhe padhta hai
+    stat_ids = np.arange(chapters * chapter_pool, dtype=np.int64)
+    stat_attempts = np.bincount(response_stat_id, minlength=stat_ids.size)
+    stat_corrects = np.bincount(response_stat_id, weights=response_correct, minlength=stat_ids.size).astype(np.int64)
+    question_stats = (stat_ids, stat_attempts, stat_corrects)
+    return (attempt_chapter, attempt_score, attempt_time), responses_table, question_stats
+
+def row_by_row(attempts, responses, question_stats):
+    """ORM iteration jaisa - har row Python object, dicts mein group"""
+    attempt_chapter, attempt_score, attempt_time = attempts
+    scores = defaultdict(list)
+    times = defaultdict(list)
+    for chapter, score, taken in zip(attempt_chapter.tolist(), attempt_score.tolist(), attempt_time.tolist()):
+        scores[chapter].append(score)
+        times[chapter].append(taken)
+    for values in list(scores.values()) + list(times.values()):
+        values.sort()
+    # question_id per-user hai, isliye har response ko class-wide question se milana padta hai
+    _, _, response_stat_id, response_correct = responses
+    per_question = defaultdict(lambda: [0, 0])
+    for question, correct in zip(response_stat_id.tolist(), response_correct.tolist()):
+        entry = per_question[question]
+        entry[0] += 1
+        entry[1] += correct
+    eligible = [item for item in per_question.items() if item[1][0] >= 5]
+    return sorted(eligible, key=lambda item: item[1][1] / item[1][0])[:20]
+
+def vectorized(attempts, responses, question_stats):
+    attempt_chapter, attempt_score, attempt_time = attempts
+    score_distribution(attempt_chapter, attempt_score)
+    time_percentiles(attempt_chapter, attempt_time)
+    return question_success_rates(*question_stats, min_attempts=5)
+
+def main():
+    responses = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    data = synthetic_class(responses)
+    _, (_, response_history_id, _, _), (stat_ids, _, _) = data
+    print(f"responses={response_history_id.size:,} attempts={data[0][0].size:,} "
+          f"history_ids={np.unique(response_history_id).size:,} class_questions={stat_ids.size:,}")
+    for name, func in (("vectorized", vectorized), ("row-by-row", row_by_row)):
+        start = time.perf_counter()
+        hardest = func(*data)
+        print(f"{name:<12}{time.perf_counter() - start:>8.3f} s  hardest={len(hardest)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# bench_payload.py - QUIZ PAYLOAD SIZE + SERIALIZATION TIME BENCHMARK
+# Run: python bench_payload.py
+import gzip
+import json
+import random
+import time
+
+import orjson
+
+from compact import compact_questions, compact_results
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+QUESTIONS = 25
+ROUNDS = 2000
+
+def build_payloads():
+    random.seed(42)
+    questions = []
+    for i in range(QUESTIONS):
+        options = [f"Option text {i}-{j} " + "lorem ipsum " * random.randint(1, 4) for j in range(4)]
+        questions.append({
+            "id": 100000 + i,
+            "question": f"Question {i + 1}: " + "which of the following statements is correct " * 2 + "?",
+            "options": options,
+            "correct_answer": options[random.randint(0, 3)]
+        })
+
+    detailed_results = []
+    for q in questions:
+        selected = random.choice(q["options"])
+        detailed_results.append({
+            "question_id": q["id"],
+            "question_text": q["question"],
+            "options": q["options"],
+            "selected_answer": selected,
+            "correct_answer": q["correct_answer"],
+            "is_correct": selected == q["correct_answer"]
+        })
+
+    return {
+        "generate-from-chapter": ({"questions": questions}, {"questions": compact_questions(questions)}),
+        "submit-quiz": ({"detailed_results": detailed_results}, {"detailed_results": compact_results(detailed_results)}),
+        "quiz-details": ({"detailed_results": detailed_results},
+                         {"detailed_results": compact_results(detailed_results, include_question=True)}),
+    }
+
+def timed(func, payload):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(payload)
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+def main():
+    print(f"{'endpoint':<24}{'mode':<9}{'raw':>8}{'gzip':>8}{'brotli':>8}{'json us':>10}{'orjson us':>11}")
+    for endpoint, (full, compact) in build_payloads().items():
+        for mode, payload in (("full", full), ("compact", compact)):
+            raw = orjson.dumps(payload)
+            gz = len(gzip.compress(raw))
+            br = len(brotli.compress(raw)) if brotli else "-"
+            json_us = timed(lambda p: json.dumps(p).encode(), payload)
+            orjson_us = timed(orjson.dumps, payload)
+            print(f"{endpoint:<24}{mode:<9}{len(raw):>8}{gz:>8}{br:>8}{json_us:>10.1f}{orjson_us:>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# circuit_breaker.py - UPSTREAM (GEMINI / WORDPRESS) KE LIYE CIRCUIT BREAKERS
+from collections import deque
+import os
+import threading
+import time
+
+class CircuitOpenError(Exception):
+    """Breaker open hai - upstream call kiye bina turant fallback karein"""
+    pass
+
+class CircuitBreaker:
+    """
+    Failure-rate based circuit breaker.
+    - closed: sab calls jaati hain, last `window` results track hote hain
+    - open: failure rate threshold cross hua, `reset_timeout` tak koi call nahi
+    - half_open: timeout ke baad sirf ek probe call; success pe closed, failure pe wapas open
+    Har state change par generation badhti hai. allow() ek ticket (generation, is_probe)
+    deta hai - purani generation mein shuru hui slow calls ka result current state nahi
+    badalta, aur half_open sirf probe ke apne result se hi badalta hai.
+    """
+
+    def __init__(self, name, failure_threshold=0.5, window=20, min_calls=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self._results = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._generation = 0
+        self._last_error = None
+        self._last_success_at = None
+        self._last_failure_at = None
+
+    def _failure_rate(self):
+        if not self._results:
+            return 0.0
+        return self._results.count(False) / len(self._results)
+
+    def _transition(self, state):
+        # lock caller ke paas hai
+        self._state = state
+        self._generation += 1
+        if state == "open":
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+        elif state == "closed":
+            self._probe_in_flight = False
+            self._results.clear()
+
+    def allow(self):
+        """Call jaane do to ticket, warna None"""
+        with self._lock:
+            if self._state == "closed":
+                return (self._generation, False)
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return None
+                self._transition("half_open")
+            # half_open: ek hi probe ko jaane do
+            if self._probe_in_flight:
+                return None
+            self._probe_in_flight = True
+            return (self._generation, True)
+
+    def _is_current(self, ticket):
+        return ticket[0] == self._generation
+
+    def record_success(self, ticket):
+        with self._lock:
+            self._last_success_at = time.time()
+            if not self._is_current(ticket):
+                return  # purani generation ki call - state par asar nahi
+            if self._state == "half_open":
+                if ticket[1]:
+                    self._transition("closed")
+                    self._results.append(True)
+                return
+            self._results.append(True)
+
+    def record_failure(self, ticket, error=None):
+        with self._lock:
+            self._last_failure_at = time.time()
+            self._last_error = str(error) if error else None
+            if not self._is_current(ticket):
+                return
+            if self._state == "half_open":
+                if ticket[1]:
+                    self._transition("open")
+                return
+            self._results.append(False)
+            if len(self._results) >= self.min_calls and self._failure_rate() >= self.failure_threshold:
+                self._transition("open")
+
+    def call(self, func, *args, **kwargs):
+        ticket = self.allow()
+        if ticket is None:
+            raise CircuitOpenError(f"{self.name} circuit open - upstream call skipped")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(ticket, e)
+            raise
+        self.record_success(ticket)
+        return result
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return self._state
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            retry_in = 0
+            if state == "open":
+                retry_in = max(0, round(self.reset_timeout - (time.monotonic() - self._opened_at), 1))
+            return {
+                "state": state,
+                "failure_rate": round(self._failure_rate(), 2),
+                "recent_calls": len(self._results),
+                "retry_in_seconds": retry_in,
+                "last_error": self._last_error,
+                "last_success_at": self._last_success_at,
+                "last_failure_at": self._last_failure_at,
+            }
+
+gemini_breaker = CircuitBreaker(
+    "gemini",
+    failure_threshold=float(os.getenv("GEMINI_BREAKER_THRESHOLD", "0.5")),
+    reset_timeout=float(os.getenv("GEMINI_BREAKER_RESET", "30")),
+)
+content_host_breaker = CircuitBreaker(
+    "content_host",
+    failure_threshold=float(os.getenv("CONTENT_BREAKER_THRESHOLD", "0.5")),
+    reset_timeout=float(os.getenv("CONTENT_BREAKER_RESET", "60")),
+)
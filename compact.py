@@ -0,0 +1,37 @@
+# compact.py - MOBILE CLIENTS KE LIYE COMPACT QUIZ PAYLOADS
+# Answer strings dobara bhejne ki jagah options list mein index bheja jata hai.
+# -1 = answer options mein nahi mila (ya blank chhoda gaya)
+
+def option_index(options, answer):
+    try:
+        return options.index(answer)
+    except (ValueError, AttributeError):
+        return -1
+
+def compact_questions(questions):
+    """generate-from-chapter: {id, q, o, a} - a = correct option index"""
+    return [{
+        "id": q["id"],
+        "q": q["question"],
+        "o": q["options"],
+        "a": option_index(q["options"], q["correct_answer"])
+    } for q in questions]
+
+def compact_results(detailed_results, include_question=False):
+    """
+    submit-quiz: client ke paas questions pehle se hain, isliye sirf indices.
+    quiz-details: include_question=True - question text aur options ek baar.
+    """
+    compacted = []
+    for r in detailed_results:
+        item = {
+            "id": r["question_id"],
+            "s": option_index(r["options"], r["selected_answer"]),
+            "c": option_index(r["options"], r["correct_answer"]),
+            "ok": r["is_correct"]
+        }
+        if include_question:
+            item["q"] = r["question_text"]
+            item["o"] = r["options"]
+        compacted.append(item)
+    return compacted
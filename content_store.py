@@ -0,0 +1,154 @@
+# content_store.py - SAB WORKERS KE BEECH SHARED CHAPTER CONTENT (MMAP)
+import fcntl
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+
+logger = logging.getLogger("question_ai.content_store")
+
+CONTENT_STORE_DIR = os.getenv("CONTENT_STORE_DIR", "/tmp/question-ai-content")
+# Itne seconds tak stored content fresh maana jayega (download skip)
+CONTENT_STORE_TTL = int(os.getenv("CONTENT_STORE_TTL", str(6 * 3600)))
+# Dead bytes (purane versions) live data se zyada hon to compaction
+COMPACT_MIN_BYTES = 1024 * 1024
+
+class SharedContentStore:
+    """
+    Append-only data file + JSON offset index. Har worker data file ko
+    read-only mmap karta hai, isliye content ki ek hi copy (page cache) rehti hai.
+
+    index.json: {"data_file": "chapters-<gen>.dat", "entries": {key: [offset, length, stored_at]}}
+    Writers file lock lete hain; index hamesha tmp + os.replace se atomically swap hota hai.
+    Compaction nayi generation file likhkar index ko uspar point karta hai.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.lock_path = os.path.join(directory, ".lock")
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._index_version = None
+        self._data_file = None
+        self._mm = None
+
+    # ---- read side ----
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+        version = (st.st_ino, st.st_mtime_ns)
+        if version == self._index_version:
+            return
+        index = self._read_index()
+        if index is None:
+            return
+        self._entries = index["entries"]
+        self._index_version = version
+        if index["data_file"] != self._data_file:
+            self._remap(index["data_file"])
+
+    def _remap(self, data_file):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._data_file = data_file
+        try:
+            with open(os.path.join(self.directory, data_file), "rb") as f:
+                if os.fstat(f.fileno()).st_size:
+                    self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            pass
+
+    def get(self, key, max_age=None):
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            offset, length, stored_at = entry
+            if max_age is not None and time.time() - stored_at > max_age:
+                return None
+            # Kisi aur worker ne append kiya ho to mapping chhoti ho sakti hai
+            if self._mm is None or offset + length > len(self._mm):
+                self._remap(self._data_file)
+                if self._mm is None or offset + length > len(self._mm):
+                    return None
+            with memoryview(self._mm) as view, view[offset:offset + length] as chunk:
+                return str(chunk, "utf-8")
+
+    # ---- write side ----
+    def put(self, key, content):
+        data = content.encode("utf-8")
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, open(self.lock_path, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            index = self._read_index() or {"data_file": self._new_data_file(), "entries": {}}
+            data_path = os.path.join(self.directory, index["data_file"])
+
+            with open(data_path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            index["entries"][key] = [offset, len(data), time.time()]
+
+            total = offset + len(data)
+            live = sum(entry[1] for entry in index["entries"].values())
+            old_data_file = None
+            if total > COMPACT_MIN_BYTES and live * 2 < total:
+                old_data_file = index["data_file"]
+                index = self._compact(index)
+
+            self._write_index(index)
+            if old_data_file:
+                # Purani mapping wale workers ke liye bhi safe - unlink se mapping invalid nahi hoti
+                os.remove(os.path.join(self.directory, old_data_file))
+
+    def _new_data_file(self):
+        return f"chapters-{time.time_ns()}.dat"
+
+    def _compact(self, index):
+        new_file = self._new_data_file()
+        entries = {}
+        with open(os.path.join(self.directory, index["data_file"]), "rb") as src, \
+                open(os.path.join(self.directory, new_file), "wb") as dst:
+            for key, (offset, length, stored_at) in index["entries"].items():
+                src.seek(offset)
+                entries[key] = [dst.tell(), length, stored_at]
+                dst.write(src.read(length))
+            dst.flush()
+            os.fsync(dst.fileno())
+        logger.info("Content store compacted", extra={"fields": {"data_file": new_file, "entries": len(entries)}})
+        return {"data_file": new_file, "entries": entries}
+
+    def _write_index(self, index):
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+
+    def stats(self):
+        with self._lock:
+            self._refresh()
+            return {
+                "directory": self.directory,
+                "data_file": self._data_file,
+                "entries": len(self._entries),
+                "mapped_bytes": len(self._mm) if self._mm is not None else 0,
+            }
+
+content_store = SharedContentStore(CONTENT_STORE_DIR)
@@ -0,0 +1,131 @@
+# exports.py - QUESTION HISTORY / QUIZ ATTEMPTS KA STREAMING EXPORT
+from datetime import date, datetime, time
+import csv
+import gzip
+import io
+import json
+
+from database import SessionLocal
+import models
+
+EXPORT_BATCH_SIZE = 1000
+
+QUESTION_HISTORY_FIELDS = [
+    "id", "user_id", "class_level", "subject", "chapter", "question_text",
+    "options", "correct_answer", "difficulty", "language", "generated_at"
+]
+QUIZ_ATTEMPT_FIELDS = [
+    "id", "user_id", "class_level", "subject", "chapter", "total_questions",
+    "correct_answers", "score_percentage", "time_taken", "attempted_at"
+]
+
+EXPORTS = {
+    "question-history": (models.QuestionHistory, models.QuestionHistory.generated_at, QUESTION_HISTORY_FIELDS),
+    "quiz-attempts": (models.QuizAttempt, models.QuizAttempt.attempted_at, QUIZ_ATTEMPT_FIELDS),
+}
+
+def _build_query(db, kind, user_id=None, class_level=None, subject=None, chapter=None,
+                 start_date: date = None, end_date: date = None):
+    model, timestamp_col, _ = EXPORTS[kind]
+    query = db.query(model)
+    if user_id is not None:
+        query = query.filter(model.user_id == user_id)
+    if class_level is not None:
+        query = query.filter(model.class_level == class_level)
+    if subject:
+        query = query.filter(model.subject == subject)
+    if chapter is not None:
+        query = query.filter(model.chapter == chapter)
+    if start_date:
+        query = query.filter(timestamp_col >= datetime.combine(start_date, time.min))
+    if end_date:
+        query = query.filter(timestamp_col <= datetime.combine(end_date, time.max))
+    # yield_per = server-side cursor, memory rows ki ginti se independent rehti hai
+    return query.order_by(model.id).yield_per(EXPORT_BATCH_SIZE)
+
+def _archived_history_values(db, user_id=None, class_level=None, subject=None, chapter=None,
+                             start_date: date = None, end_date: date = None):
+    """
+    Retention job ki question_history_archives chunks (gzip NDJSON) se rows -
+    taaki full dump mein purani history bhi aaye. Filters yahan Python mein.
+    """
+    archive = models.QuestionHistoryArchive
+    query = db.query(archive)
+    if start_date:
+        query = query.filter(archive.month >= start_date.strftime("%Y-%m"))
+    if end_date:
+        query = query.filter(archive.month <= end_date.strftime("%Y-%m"))
+    # Ek chunk max RETENTION_BATCH_SIZE rows - ek baar mein ek hi payload memory mein
+    for chunk in query.order_by(archive.first_id).yield_per(1):
+        for line in gzip.decompress(chunk.payload).decode("utf-8").splitlines():
+            record = json.loads(line)
+            if user_id is not None and record["user_id"] != user_id:
+                continue
+            if class_level is not None and record["class_level"] != class_level:
+                continue
+            if subject and record["subject"] != subject:
+                continue
+            if chapter is not None and record["chapter"] != chapter:
+                continue
+            if start_date or end_date:
+                generated_on = datetime.fromisoformat(record["generated_at"]).date() if record["generated_at"] else None
+                if generated_on is None:
+                    continue
+                if start_date and generated_on < start_date:
+                    continue
+                if end_date and generated_on > end_date:
+                    continue
+            yield record
+
+def _export_values(db, kind, fields, **filters):
+    """question-history mein pehle archived rows, phir live table"""
+    if kind == "question-history":
+        yield from _archived_history_values(db, **filters)
+    for row in _build_query(db, kind, **filters):
+        yield _row_values(row, fields)
+
+def _row_values(row, fields):
+    values = {}
+    for field in fields:
+        value = getattr(row, field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        values[field] = value
+    return values
+
+def stream_export(kind, fmt="ndjson", **filters):
+    """
+    Generator - apna session khud kholta/band karta hai kyunki response
+    request handler ke return hone ke baad tak stream hota rehta hai.
+    Har EXPORT_BATCH_SIZE rows par ek chunk yield hota hai.
+    """
+    _, _, fields = EXPORTS[kind]
+    db = SessionLocal()
+    try:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == "csv" else None
+        if writer:
+            writer.writerow(fields)
+
+        pending = 0
+        for values in _export_values(db, kind, fields, **filters):
+            if writer:
+                writer.writerow([values[f] for f in fields])
+            else:
+                if "options" in values and values["options"]:
+                    values["options"] = json.loads(values["options"])
+                buffer.write(json.dumps(values, ensure_ascii=False))
+                buffer.write("\n")
+            pending += 1
+            if pending >= EXPORT_BATCH_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+                # ORM identity map ko badhne na dein
+                db.expunge_all()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
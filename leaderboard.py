@@ -0,0 +1,138 @@
+# leaderboard.py - PER-CHAPTER LEADERBOARDS (IN-MEMORY SORTED STRUCTURE)
+from sortedcontainers import SortedList
+from sqlalchemy.orm import Session
+import logging
+import os
+import threading
+
+import models
+
+logger = logging.getLogger("question_ai.leaderboard")
+
+# Refresh last_seen_id se thoda peeche se padhta hai - der se commit hue (chhote id wale)
+# attempts bhi mil jayein; best-score merge idempotent hai isliye overlap safe hai
+LEADERBOARD_REFRESH_OVERLAP = int(os.getenv("LEADERBOARD_REFRESH_OVERLAP", "1000"))
+
+class ChapterLeaderboard:
+    """
+    Har user ka best attempt ek baar SortedList mein.
+    Key = (-score, time_taken, user_id): zyada score pehle, tie par kam time.
+    rank / top-N dono O(log n).
+    """
+
+    def __init__(self):
+        self._ranked = SortedList()
+        self._best = {}  # user_id -> key
+
+    def submit(self, user_id, score, time_taken):
+        key = (-score, time_taken or 0, user_id)
+        current = self._best.get(user_id)
+        if current is not None:
+            if current <= key:
+                return  # purana attempt behtar ya barabar
+            self._ranked.remove(current)
+        self._ranked.add(key)
+        self._best[user_id] = key
+
+    def top(self, n):
+        return [self._entry(i, key) for i, key in enumerate(self._ranked.islice(0, n))]
+
+    def rank(self, user_id):
+        key = self._best.get(user_id)
+        if key is None:
+            return None
+        return self._entry(self._ranked.index(key), key)
+
+    def __len__(self):
+        return len(self._ranked)
+
+    @staticmethod
+    def _entry(position, key):
+        return {
+            "rank": position + 1,
+            "user_id": key[2],
+            "best_score": round(-key[0], 2),
+            "time_taken": key[1]
+        }
+
+class LeaderboardRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boards = {}  # (class_level, subject, chapter) -> ChapterLeaderboard
+        # Rebuild ke dauraan aaye record() calls - swap se pehle naye boards mein replay
+        self._rebuild_buffer = None
+        self._last_seen_id = 0  # DB se padha sabse bada quiz_attempts.id
+
+    def record(self, class_level, subject, chapter, user_id, score, time_taken):
+        with self._lock:
+            board = self._boards.setdefault((class_level, subject, chapter), ChapterLeaderboard())
+            board.submit(user_id, score, time_taken)
+            if self._rebuild_buffer is not None:
+                self._rebuild_buffer.append((class_level, subject, chapter, user_id, score, time_taken))
+
+    def snapshot(self, class_level, subject, chapter, user_id, limit):
+        with self._lock:
+            board = self._boards.get((class_level, subject, chapter))
+            if board is None:
+                return 0, [], None
+            return len(board), board.top(limit), board.rank(user_id)
+
+    @staticmethod
+    def _attempts_query(db: Session, after_id=None):
+        qa = models.QuizAttempt
+        query = db.query(
+            qa.id, qa.class_level, qa.subject, qa.chapter,
+            qa.user_id, qa.score_percentage, qa.time_taken
+        ).filter(qa.total_questions > 0)  # khali quiz board par nahi
+        if after_id is not None:
+            query = query.filter(qa.id > after_id).order_by(qa.id)
+        return query.execution_options(yield_per=5000)
+
+    def rebuild(self, db: Session):
+        """
+        DB ke saare quiz attempts se naye boards banakar ek saath swap (startup par).
+        Query shuru hone ke baad record() hue attempts buffer hote hain aur swap
+        se pehle replay - best-score logic idempotent hai, isliye double count nahi.
+        """
+        with self._lock:
+            self._rebuild_buffer = []
+        boards = {}
+        last_seen_id = 0
+        count = 0
+        try:
+            for attempt_id, class_level, subject, chapter, user_id, score, time_taken in self._attempts_query(db):
+                board = boards.setdefault((class_level, subject, chapter), ChapterLeaderboard())
+                board.submit(user_id, score or 0, time_taken)
+                last_seen_id = max(last_seen_id, attempt_id)
+                count += 1
+        except Exception:
+            with self._lock:
+                self._rebuild_buffer = None
+            raise
+        with self._lock:
+            for class_level, subject, chapter, user_id, score, time_taken in self._rebuild_buffer:
+                board = boards.setdefault((class_level, subject, chapter), ChapterLeaderboard())
+                board.submit(user_id, score, time_taken)
+            self._rebuild_buffer = None
+            self._boards = boards
+            self._last_seen_id = last_seen_id
+        logger.info("Leaderboards rebuilt", extra={"fields": {"attempts": count, "chapters": len(boards)}})
+
+    def refresh(self, db: Session):
+        """
+        Incremental - sirf last_seen_id ke baad ke attempts (dusre workers ke submits)
+        current boards mein merge. Cost naye attempts ke hisaab se, table size se nahi.
+        """
+        with self._lock:
+            after_id = max(0, self._last_seen_id - LEADERBOARD_REFRESH_OVERLAP)
+        rows = self._attempts_query(db, after_id).all()
+        if not rows:
+            return 0
+        with self._lock:
+            for attempt_id, class_level, subject, chapter, user_id, score, time_taken in rows:
+                board = self._boards.setdefault((class_level, subject, chapter), ChapterLeaderboard())
+                board.submit(user_id, score or 0, time_taken)
+            self._last_seen_id = max(self._last_seen_id, rows[-1][0])
+        return len(rows)
+
+leaderboards = LeaderboardRegistry()
@@ -0,0 +1,89 @@
+# logging_config.py - NON-BLOCKING STRUCTURED (JSON) LOGGING
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import time
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Raw Gemini output jaise bade payloads ka kitna hissa log ho (0.0 - 1.0)
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+class DropWhenFullQueueHandler(QueueHandler):
+    """
+    Request thread kabhi block nahi hoga - queue full ho to record drop.
+    request_id enqueue se pehle lagta hai kyunki listener thread ka context alag hai.
+    """
+
+    dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DropWhenFullQueueHandler.dropped += 1
+
+_listener = None
+
+def setup_logging():
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DropWhenFullQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+def log_payload(logger, message, payload, level=logging.DEBUG, **fields):
+    """
+    Bade payloads (raw LLM output) sirf sampled requests par, truncate karke log honge.
+    Baaki requests par sirf size log hota hai.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    fields["payload_chars"] = len(payload) if payload else 0
+    if payload and random.random() < LOG_PAYLOAD_SAMPLE_RATE:
+        fields["payload"] = payload[:LOG_PAYLOAD_MAX_CHARS]
+        fields["payload_truncated"] = len(payload) > LOG_PAYLOAD_MAX_CHARS
+    logger.log(level, message, extra={"fields": fields})
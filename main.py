@@ -1,6 +1,10 @@
 # main.py - COMPLETE UPDATED VERSION WITH QUIZ SYSTEM
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request, Header
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 import os
 import random
@@ -10,16 +14,58 @@ from datetime import date, datetime
 import requests
 from docx import Document
 import io
+import logging
+import uuid
 
-from database import get_db, engine
+from logging_config import setup_logging, log_payload, request_id_var
+from database import get_db, engine, SessionLocal
 import models
 import schemas
-from auth import create_access_token, get_current_user
+from auth import create_access_token, get_current_user, is_admin_token
+from admission import llm_admission, llm_slot
+from circuit_breaker import CircuitOpenError, gemini_breaker, content_host_breaker
+import stats
+import exports
+import analytics
+from response_cache import ResponseCache, cache_key
+from compact import compact_questions, compact_results
+from leaderboard import leaderboards
+import threading
+import time
+from content_store import content_store, CONTENT_STORE_TTL
+from profiling import install_profiling
+
+setup_logging()
+logger = logging.getLogger("question_ai")
 
 # Create tables
 models.Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Question-AI", version="3.0.0")
+# orjson - default json se kaafi tez serialization
+app = FastAPI(title="Question-AI", version="3.0.0", default_response_class=ORJSONResponse)
+
+# ✅ REQUEST ID - har log line mein aayega, response header mein bhi
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+# ✅ OPT-IN PROFILING (X-Profile: 1 + X-Admin-Token) - ADMIN_TOKEN na ho to disabled
+install_profiling(app, engine)
+
+# ✅ RESPONSE COMPRESSION - brotli (optional) warna gzip, chhote responses skip
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1000"))
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+except ImportError:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
 
 # Gemini AI Setup
 try:
@@ -28,13 +74,44 @@ try:
     if GEMINI_API_KEY:
         genai.configure(api_key=GEMINI_API_KEY)
         GEMINI_AVAILABLE = True
-        print("Gemini AI configured successfully")
+        logger.info("Gemini AI configured successfully")
     else:
         GEMINI_AVAILABLE = False
-        print("GEMINI_API_KEY not found")
+        logger.warning("GEMINI_API_KEY not found")
 except Exception as e:
     GEMINI_AVAILABLE = False
-    print(f"Gemini AI setup failed: {e}")
+    logger.error("Gemini AI setup failed: %s", e)
+
+# ✅ LEADERBOARDS - startup par DB se full rebuild
+# Multi-worker setup mein har worker ka apna copy hai, isliye periodic incremental
+# refresh - sirf pichhle refresh ke baad ke attempts padhe jaate hain
+LEADERBOARD_REBUILD_SECONDS = int(os.getenv("LEADERBOARD_REBUILD_SECONDS", "600"))
+
+def rebuild_leaderboards():
+    db = SessionLocal()
+    try:
+        leaderboards.rebuild(db)
+    except Exception as e:
+        logger.error("Leaderboard rebuild failed: %s", e)
+    finally:
+        db.close()
+
+def _leaderboard_refresher():
+    while True:
+        time.sleep(LEADERBOARD_REBUILD_SECONDS)
+        db = SessionLocal()
+        try:
+            leaderboards.refresh(db)
+        except Exception as e:
+            logger.error("Leaderboard refresh failed: %s", e)
+        finally:
+            db.close()
+
+@app.on_event("startup")
+def load_leaderboards():
+    rebuild_leaderboards()
+    if LEADERBOARD_REBUILD_SECONDS > 0:
+        threading.Thread(target=_leaderboard_refresher, name="leaderboard-refresher", daemon=True).start()
 
 # ✅ RENDER HEALTH CHECK KE LIYE HEAD ROUTE
 @app.head("/")
@@ -54,7 +131,16 @@ def home():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "admission": llm_admission.stats(),
+        "content_store": content_store.stats(),
+        "legacy_question_cache": legacy_question_cache.stats(),
+        "circuit_breakers": {
+            "gemini": gemini_breaker.stats(),
+            "content_host": content_host_breaker.stats()
+        }
+    }
 
 # ✅ NEW: AVAILABLE SUBJECTS AND CHAPTERS
 @app.get("/available-subjects")
@@ -72,16 +158,29 @@ def get_available_subjects():
         ]
     }
 
+def _fetch_doc(url):
+    """5xx ko failure maante hain taaki breaker ko pata chale host down hai"""
+    response = requests.get(url, timeout=30)
+    if response.status_code >= 500:
+        raise requests.HTTPError(f"Content host returned {response.status_code}")
+    return response
+
 # ✅ NEW: DOWNLOAD DOC CONTENT FROM WORDPRESS
 def download_doc_content(class_level, subject, chapter):
     """WordPress se DOC file download karke text extract karega"""
+    # Shared mmap store - sab workers ki ek hi copy; fresh ho to download skip
+    cache_key = f"{class_level}|{subject}|{chapter}"
+    cached = content_store.get(cache_key, max_age=CONTENT_STORE_TTL)
+    if cached:
+        return cached
+    
     try:
         # URL format based on your WordPress site
         subject_formatted = subject.capitalize()
         url = f"https://5minanswer.com/wp-content/uploads/2025/10/Class-{class_level}{subject_formatted}-Chapter-{chapter}.docx"
         
-        print(f"Downloading from: {url}")
-        response = requests.get(url, timeout=30)
+        logger.debug("Downloading chapter doc", extra={"fields": {"url": url}})
+        response = content_host_breaker.call(_fetch_doc, url)
         
         if response.status_code == 200:
             # DOC file parse karein
@@ -91,15 +190,24 @@ def download_doc_content(class_level, subject, chapter):
                 if paragraph.text.strip():
                     content += paragraph.text + "\n"
             
-            print(f"Downloaded content length: {len(content)}")
+            logger.info("Chapter doc downloaded", extra={"fields": {"cache_key": cache_key, "content_chars": len(content)}})
+            if content:
+                try:
+                    content_store.put(cache_key, content)
+                except OSError as e:
+                    logger.error("Content store write failed: %s", e)
             return content if content else None
         else:
-            print(f"Download failed with status: {response.status_code}")
+            logger.warning("Chapter doc download failed", extra={"fields": {"url": url, "status_code": response.status_code}})
             return None
             
+    except CircuitOpenError as e:
+        logger.warning("DOC download skipped: %s", e)
+        # Breaker open - purana (stale) content bhi chalega
+        return content_store.get(cache_key)
     except Exception as e:
-        print(f"DOC download error: {e}")
-        return None
+        logger.error("DOC download error: %s", e)
+        return content_store.get(cache_key)
 
 # ✅ FIXED: DAILY LIMIT CHECKER
 def check_daily_limit(db: Session, user_id: int, subject: str, requested_count: int):
@@ -180,8 +288,8 @@ def generate_questions_from_content(content, question_count=25, difficulty="medi
         ]
         """
         
-        response = model.generate_content(prompt)
-        print("Gemini Response:", response.text)
+        response = gemini_breaker.call(model.generate_content, prompt)
+        log_payload(logger, "Gemini response", response.text, level=logging.INFO, endpoint="generate-from-chapter")
         
         # JSON extract karein
         import re
@@ -193,7 +301,7 @@ def generate_questions_from_content(content, question_count=25, difficulty="medi
             return generate_sample_questions_from_subject("general", question_count)
             
     except Exception as e:
-        print(f"Gemini Error: {e}")
+        logger.error("Gemini Error: %s", e)
         return generate_sample_questions_from_subject("general", question_count)
 
 def generate_sample_questions_from_subject(subject, count=25):
@@ -211,7 +319,9 @@ def generate_sample_questions_from_subject(subject, count=25):
 @app.post("/generate-from-chapter")
 def generate_from_chapter(
     request: schemas.ChapterRequest,
+    compact: bool = False,
     current_user: models.User = Depends(get_current_user),
+    _slot: None = Depends(llm_slot),
     db: Session = Depends(get_db)
 ):
     # 1. Daily limit check - FIXED CALL
@@ -219,21 +329,32 @@ def generate_from_chapter(
     if not limit_ok:
         raise HTTPException(status_code=400, detail=message)
     
-    # 2. Download DOC content
-    content = download_doc_content(request.class_level, request.subject, request.chapter)
-    if not content:
-        # Fallback to AI without content
-        content = f"Generate {request.question_count} questions for Class {request.class_level} {request.subject} Chapter {request.chapter}"
-    
-    # 3. Generate questions
-    questions = generate_questions_from_content(
-        content, 
-        request.question_count, 
-        request.difficulty, 
-        request.language
-    )
+    # 2. Gemini down ho to question bank se target difficulty wale questions
+    questions = []
+    if not GEMINI_AVAILABLE or gemini_breaker.state == "open":
+        questions = stats.pick_bank_questions(
+            db, request.class_level, request.subject, request.chapter,
+            request.difficulty, request.question_count, request.language
+        )
+    
+    # Bank se kam mile to sirf bache hue questions generate karein
+    shortfall = request.question_count - len(questions)
+    if shortfall > 0:
+        # 3. Download DOC content
+        content = download_doc_content(request.class_level, request.subject, request.chapter)
+        if not content:
+            # Fallback to AI without content
+            content = f"Generate {shortfall} questions for Class {request.class_level} {request.subject} Chapter {request.chapter}"
+        
+        # 4. Generate questions
+        questions += generate_questions_from_content(
+            content, 
+            shortfall, 
+            request.difficulty, 
+            request.language
+        )
     
-    # 4. Save to history with unique IDs for quiz system
+    # 5. Save to history with unique IDs for quiz system
     saved_questions = []
     for i, q in enumerate(questions):
         history = models.QuestionHistory(
@@ -267,47 +388,54 @@ def generate_from_chapter(
         "language": request.language,
         "questions_generated": len(questions),
         "daily_remaining": 25 - get_today_usage(db, current_user.id, request.subject),
-        "questions": saved_questions  # Now includes IDs for quiz
+        "format": "compact" if compact else "full",
+        "questions": compact_questions(saved_questions) if compact else saved_questions  # Now includes IDs for quiz
     }
 
+def grade_quiz(request: schemas.QuizSubmission):
+    """Answers ko original questions se match karke result calculate karega"""
+    correct_count = 0
+    detailed_results = []
+    
+    # Pehla matching question hi use hoga (duplicate IDs par)
+    questions_by_id = {}
+    for q in request.questions:
+        questions_by_id.setdefault(q.get('id'), q)
+    
+    for answer in request.answers:
+        # Find the original question
+        original_question = questions_by_id.get(answer.question_id)
+        if not original_question:
+            continue
+        
+        is_correct = (answer.selected_answer == original_question['correct_answer'])
+        if is_correct:
+            correct_count += 1
+        
+        detailed_results.append({
+            "question_id": answer.question_id,
+            "question_text": original_question['question'],
+            "options": original_question['options'],
+            "selected_answer": answer.selected_answer,
+            "correct_answer": original_question['correct_answer'],
+            "is_correct": is_correct
+        })
+    
+    total_questions = len(request.answers)
+    score_percentage = (correct_count / total_questions) * 100 if total_questions > 0 else 0
+    return correct_count, total_questions, score_percentage, detailed_results
+
 # ✅ NEW: QUIZ SUBMISSION ENDPOINT
 @app.post("/submit-quiz")
 def submit_quiz(
     request: schemas.QuizSubmission,
+    compact: bool = False,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     try:
         # Calculate results
-        correct_count = 0
-        detailed_results = []
-        
-        for answer in request.answers:
-            # Find the original question
-            original_question = None
-            for q in request.questions:
-                if q.get('id') == answer.question_id:
-                    original_question = q
-                    break
-            
-            if not original_question:
-                continue
-            
-            is_correct = (answer.selected_answer == original_question['correct_answer'])
-            if is_correct:
-                correct_count += 1
-            
-            detailed_results.append({
-                "question_id": answer.question_id,
-                "question_text": original_question['question'],
-                "options": original_question['options'],
-                "selected_answer": answer.selected_answer,
-                "correct_answer": original_question['correct_answer'],
-                "is_correct": is_correct
-            })
-        
-        total_questions = len(request.answers)
-        score_percentage = (correct_count / total_questions) * 100 if total_questions > 0 else 0
+        correct_count, total_questions, score_percentage, detailed_results = grade_quiz(request)
         
         # Save quiz attempt
         quiz_attempt = models.QuizAttempt(
@@ -337,8 +465,20 @@ def submit_quiz(
             )
             db.add(response)
         
+        # Difficulty / weak-chapter counters - same transaction
+        stats.record_quiz_stats(
+            db, current_user.id, request.class_level,
+            request.subject, request.chapter, detailed_results, request.language
+        )
+        
         db.commit()
         
+        if total_questions:
+            leaderboards.record(
+                request.class_level, request.subject, request.chapter,
+                current_user.id, score_percentage, request.time_taken
+            )
+        
         return {
             "quiz_id": quiz_attempt.id,
             "total_questions": total_questions,
@@ -350,13 +490,139 @@ def submit_quiz(
             "chapter": request.chapter,
             "class_level": request.class_level,
             "attempted_at": quiz_attempt.attempted_at.isoformat(),
-            "detailed_results": detailed_results
+            "format": "compact" if compact else "full",
+            "detailed_results": compact_results(detailed_results) if compact else detailed_results
         }
         
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Quiz submission failed: {str(e)}")
 
+MAX_SYNC_BATCH = 100
+
+# ✅ NEW: OFFLINE QUIZZES KA BATCH SYNC
+@app.post("/sync-quizzes", response_model=schemas.QuizSyncResponse, response_model_exclude_none=True)
+def sync_quizzes(
+    request: schemas.QuizSyncRequest,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Offline liye gaye quizzes ek saath submit karein.
+    Sab attempts/responses ek transaction mein bulk insert hote hain;
+    pehle se synced client_submission_id dobara insert nahi hote.
+    """
+    if len(request.submissions) > MAX_SYNC_BATCH:
+        raise HTTPException(status_code=400, detail=f"Ek batch mein maximum {MAX_SYNC_BATCH} quizzes sync ho sakte hain")
+    
+    client_ids = [s.client_submission_id for s in request.submissions]
+    existing = {
+        a.client_submission_id: a
+        for a in db.query(models.QuizAttempt).filter(
+            models.QuizAttempt.user_id == current_user.id,
+            models.QuizAttempt.client_submission_id.in_(client_ids)
+        ).all()
+    } if client_ids else {}
+    
+    results = {}
+    pending = []  # (submission, correct_count, total, score, detailed_results)
+    for submission in request.submissions:
+        cid = submission.client_submission_id
+        if cid in results:
+            continue
+        if cid in existing:
+            attempt = existing[cid]
+            results[cid] = {
+                "client_submission_id": cid,
+                "status": "duplicate",
+                "quiz_id": attempt.id,
+                "total_questions": attempt.total_questions,
+                "correct_answers": attempt.correct_answers,
+                "score_percentage": round(attempt.score_percentage, 2)
+            }
+            continue
+        try:
+            graded = grade_quiz(submission)
+        except Exception as e:
+            results[cid] = {"client_submission_id": cid, "status": "error", "error": f"Grading failed: {str(e)}"}
+            continue
+        results[cid] = None
+        pending.append((submission,) + graded)
+    
+    if pending:
+        try:
+            attempt_rows = db.execute(
+                insert(models.QuizAttempt).returning(
+                    models.QuizAttempt.id, sort_by_parameter_order=True
+                ),
+                [{
+                    "user_id": current_user.id,
+                    "class_level": sub.class_level,
+                    "subject": sub.subject,
+                    "chapter": sub.chapter,
+                    "total_questions": total,
+                    "correct_answers": correct,
+                    "score_percentage": score,
+                    "time_taken": sub.time_taken,
+                    "client_submission_id": sub.client_submission_id
+                } for sub, correct, total, score, _ in pending]
+            ).all()
+            
+            response_rows = []
+            # Poore batch ke counter deltas pehle merge, phir har key ka ek upsert
+            stat_deltas = {}
+            for (sub, correct, total, score, detailed), row in zip(pending, attempt_rows):
+                for result in detailed:
+                    response_rows.append({
+                        "user_id": current_user.id,
+                        "quiz_attempt_id": row.id,
+                        "question_id": result["question_id"],
+                        "question_text": result["question_text"],
+                        "selected_answer": result["selected_answer"],
+                        "correct_answer": result["correct_answer"],
+                        "is_correct": 1 if result["is_correct"] else 0,
+                        "options": json.dumps(result["options"])
+                    })
+                stats.collect_quiz_stats(
+                    stat_deltas, current_user.id, sub.class_level,
+                    sub.subject, sub.chapter, detailed, sub.language
+                )
+                results[sub.client_submission_id] = {
+                    "client_submission_id": sub.client_submission_id,
+                    "status": "created",
+                    "quiz_id": row.id,
+                    "total_questions": total,
+                    "correct_answers": correct,
+                    "score_percentage": round(score, 2)
+                }
+            
+            if response_rows:
+                db.execute(insert(models.StudentResponse), response_rows)
+            stats.apply_quiz_stats(db, stat_deltas)
+            
+            db.commit()
+            
+            for sub, correct, total, score, _ in pending:
+                if total:
+                    leaderboards.record(sub.class_level, sub.subject, sub.chapter, current_user.id, score, sub.time_taken)
+        except IntegrityError as e:
+            db.rollback()
+            if "client_submission" not in str(e.orig):
+                raise HTTPException(status_code=500, detail=f"Quiz sync failed: {str(e.orig)}")
+            # Kisi parallel retry ne same submission pehle hi save kar diya
+            raise HTTPException(status_code=409, detail="Sync conflict - kuch submissions parallel mein save ho rahe the. Dobara sync karein.")
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Quiz sync failed: {str(e)}")
+    
+    items = [results[cid] for cid in dict.fromkeys(client_ids)]
+    return {
+        "synced": sum(1 for i in items if i["status"] == "created"),
+        "duplicates": sum(1 for i in items if i["status"] == "duplicate"),
+        "errors": sum(1 for i in items if i["status"] == "error"),
+        "results": items
+    }
+
 # ✅ NEW: PERFORMANCE HISTORY ENDPOINT
 @app.get("/performance-history")
 def get_performance_history(
@@ -401,6 +667,7 @@ def get_performance_history(
 @app.get("/quiz-details/{quiz_id}")
 def get_quiz_details(
     quiz_id: int,
+    compact: bool = False,
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -439,7 +706,125 @@ def get_quiz_details(
         "score_percentage": quiz_attempt.score_percentage,
         "time_taken": quiz_attempt.time_taken,
         "attempted_at": quiz_attempt.attempted_at.isoformat(),
-        "detailed_results": detailed_results
+        "format": "compact" if compact else "full",
+        "detailed_results": compact_results(detailed_results, include_question=True) if compact else detailed_results
+    }
+
+# ✅ NEW: WEAK CHAPTERS REPORT (incremental counters se)
+@app.get("/analytics/weak-chapters")
+def get_weak_chapters(
+    subject: str = None,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    chapters = stats.get_weak_chapters(db, current_user.id, subject)
+    return {
+        "user_id": current_user.id,
+        "weak_chapters": [c for c in chapters if c["is_weak"]],
+        "chapters": chapters
+    }
+
+# ✅ NEW: EMPIRICAL QUESTION DIFFICULTY
+@app.get("/analytics/question-difficulty/{class_level}/{subject}/{chapter}")
+def get_question_difficulty(
+    class_level: int,
+    subject: str,
+    chapter: int,
+    limit: int = 100,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    questions = stats.get_question_difficulty(db, class_level, subject, chapter, min(limit, 500))
+    return {
+        "class_level": class_level,
+        "subject": subject,
+        "chapter": chapter,
+        "min_attempts": stats.MIN_ATTEMPTS_FOR_DIFFICULTY,
+        "questions": questions
+    }
+
+# ✅ NEW: STREAMING EXPORT (NDJSON / CSV)
+@app.get("/export/{kind}")
+def export_data(
+    kind: str,
+    format: str = "ndjson",
+    subject: str = None,
+    chapter: int = None,
+    class_level: int = None,
+    user_id: int = None,
+    start_date: date = None,
+    end_date: date = None,
+    x_admin_token: str = Header(None),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    kind: question-history / quiz-attempts
+    Normal user sirf apna data export kar sakta hai; admin token ke saath
+    poori class (class_level) ya kisi bhi user_id ka export.
+    """
+    if kind not in exports.EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {kind}")
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    
+    if not is_admin_token(x_admin_token):
+        if user_id is not None and user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Dusre users ka data export karne ke liye admin token chahiye")
+        user_id = current_user.id
+    elif user_id is None and class_level is None:
+        raise HTTPException(status_code=400, detail="Admin export ke liye user_id ya class_level dein")
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"{kind}-{date.today().isoformat()}.{'csv' if format == 'csv' else 'ndjson'}"
+    return StreamingResponse(
+        exports.stream_export(
+            kind, format,
+            user_id=user_id, class_level=class_level, subject=subject,
+            chapter=chapter, start_date=start_date, end_date=end_date
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# ✅ NEW: TEACHER DASHBOARD - CLASS-WIDE REPORT (admin token chahiye)
+@app.get("/reports/class/{class_level}/{subject}")
+def get_class_report(
+    class_level: int,
+    subject: str,
+    chapter: int = None,
+    min_attempts: int = 5,
+    limit: int = 20,
+    x_admin_token: str = Header(None),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Class reports ke liye admin token chahiye")
+    
+    return analytics.class_report(
+        db, class_level, subject, chapter,
+        max(1, min_attempts), max(1, min(limit, 100))
+    )
+
+# ✅ NEW: CHAPTER LEADERBOARD
+@app.get("/leaderboard/{class_level}/{subject}/{chapter}")
+def get_leaderboard(
+    class_level: int,
+    subject: str,
+    chapter: int,
+    limit: int = 10,
+    current_user: models.User = Depends(get_current_user)
+):
+    total, top, my_rank = leaderboards.snapshot(
+        class_level, subject, chapter, current_user.id, max(1, min(limit, 100))
+    )
+    return {
+        "class_level": class_level,
+        "subject": subject,
+        "chapter": chapter,
+        "total_participants": total,
+        "top": top,
+        "my_rank": my_rank
     }
 
 # ✅ NEW: MY USAGE STATUS
@@ -522,6 +907,16 @@ def get_profile(current_user: models.User = Depends(get_current_user)):
         "email": current_user.email
     }
 
+# Legacy endpoint ka prompt badle to ye version badhayein - purani cache entries apne aap bekaar
+LEGACY_PROMPT_VERSION = "v1"
+
+legacy_question_cache = ResponseCache(
+    "legacy-questions",
+    max_entries=int(os.getenv("LEGACY_CACHE_MAX_ENTRIES", "1024")),
+    ttl=int(os.getenv("LEGACY_CACHE_TTL", "3600")),
+    stale_ttl=int(os.getenv("LEGACY_CACHE_STALE_TTL", "86400"))
+)
+
 # ✅ OLD QUESTION GENERATION (FOR BACKWARD COMPATIBILITY)
 @app.post("/generate-questions")
 def generate_questions(
@@ -529,10 +924,28 @@ def generate_questions(
     current_user: models.User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    cache_status = None
     if GEMINI_AVAILABLE:
+        key = cache_key(request.subject, request.chapter, request.difficulty, request.language, LEGACY_PROMPT_VERSION)
         try:
-            questions = generate_questions_with_gemini(request)
-            source = "Gemini AI"
+            # Fresh/stale cache hit par Gemini call nahi (stale par background refresh)
+            questions, cache_status = legacy_question_cache.lookup(
+                key, lambda: generate_questions_with_gemini(request)
+            )
+            if questions is None:
+                # Admission slot sirf leader ke loader mein - cache hits aur same key
+                # ke followers load shedding ke slots nahi gherte
+                def load_with_slot():
+                    llm_admission.acquire()
+                    try:
+                        return generate_questions_with_gemini(request)
+                    finally:
+                        llm_admission.release()
+
+                questions = legacy_question_cache.load(key, load_with_slot)
+            source = "Gemini AI" if cache_status == "miss" else "Gemini AI (cached)"
+        except HTTPException:
+            raise
         except Exception as e:
             questions = generate_sample_questions(request)
             source = f"Sample (AI Error: {str(e)})"
@@ -545,7 +958,8 @@ def generate_questions(
         "subject": request.subject,
         "chapter": request.chapter,
         "questions": questions,
-        "count": len(questions)
+        "count": len(questions),
+        "cache": cache_status
     }
 
 def generate_questions_with_gemini(request: schemas.QuestionRequest):
@@ -573,8 +987,8 @@ def generate_questions_with_gemini(request: schemas.QuestionRequest):
         ]
         """
         
-        response = model.generate_content(prompt)
-        print("Gemini Raw Response:", response.text)
+        response = gemini_breaker.call(model.generate_content, prompt)
+        log_payload(logger, "Gemini raw response", response.text, level=logging.INFO, endpoint="generate-questions")
         
         # JSON extract karein
         import re
@@ -583,10 +997,11 @@ def generate_questions_with_gemini(request: schemas.QuestionRequest):
             questions = json.loads(json_match.group())
             return questions[:3]  # Maximum 3 questions
         else:
-            return generate_sample_questions(request)
+            # Exception taaki sample questions cache mein na jayein
+            raise ValueError("Gemini response mein JSON nahi mila")
             
     except Exception as e:
-        print(f"Gemini Error: {e}")
+        logger.error("Gemini Error: %s", e)
         raise e
 
 def generate_sample_questions(request: schemas.QuestionRequest):
@@ -625,28 +1040,49 @@ def generate_sample_questions(request: schemas.QuestionRequest):
 
 # ✅ TEST GEMINI CONNECTION
 @app.get("/test-gemini")
-def test_gemini():
-    """Test Gemini AI connection"""
+def test_gemini(live: bool = False):
+    """
+    Gemini ka status breaker se report karein.
+    Live upstream call sirf ?live=true par, aur woh bhi breaker ke through.
+    """
     if not GEMINI_AVAILABLE:
         return {
             "gemini_status": "not_configured",
             "message": "GEMINI_API_KEY environment variable not set"
         }
     
+    breaker = gemini_breaker.stats()
+    if not live:
+        return {
+            "gemini_status": "degraded" if breaker["state"] != "closed" else "configured",
+            "model_used": "gemini-2.0-flash",
+            "circuit_breaker": breaker,
+            "message": "Breaker state reported; pass ?live=true for a live call"
+        }
+    
     try:
         model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content("Say 'Hello World' in one word.")
+        response = gemini_breaker.call(model.generate_content, "Say 'Hello World' in one word.")
         
         return {
             "gemini_status": "connected",
             "model_used": "gemini-2.0-flash",
             "response": response.text,
+            "circuit_breaker": gemini_breaker.stats(),
             "message": "Gemini AI is working successfully!"
         }
+    except CircuitOpenError as e:
+        return {
+            "gemini_status": "circuit_open",
+            "error": str(e),
+            "circuit_breaker": gemini_breaker.stats(),
+            "message": "Gemini calls are paused after repeated failures"
+        }
     except Exception as e:
         return {
             "gemini_status": "error",
             "error": str(e),
+            "circuit_breaker": gemini_breaker.stats(),
             "message": "Gemini AI connection failed"
         }
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Date, Text
+from sqlalchemy import Column, Integer, String, DateTime, Date, Text, Float, Index, UniqueConstraint, LargeBinary
 from sqlalchemy.sql import func
 from database import Base
 
@@ -39,6 +39,20 @@ class UsageLimit(Base):
     last_used_date = Column(Date, nullable=False)
     questions_generated_today = Column(Integer, default=0)
 
+# RETENTION JOB - purane usage_limits rows yahan monthly roll-up hote hain
+class UsageMonthlySummary(Base):
+    __tablename__ = "usage_monthly_summaries"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    subject = Column(String(50), nullable=False)
+    month = Column(Date, nullable=False)  # mahine ki pehli tareekh
+    days_used = Column(Integer, default=0, nullable=False)
+    questions_generated = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "subject", "month", name="uq_usage_monthly_user_subject_month"),
+    )
+
 class QuestionHistory(Base):
     __tablename__ = "question_history"
     id = Column(Integer, primary_key=True, index=True)
@@ -51,4 +65,81 @@ class QuestionHistory(Base):
     correct_answer = Column(String(500), nullable=False)
     difficulty = Column(String(20), default="medium")
     language = Column(String(10), default="english")
-    generated_at = Column(DateTime(timezone=True), server_default=func.now())
+    generated_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+# RETENTION JOB - purani question_history gzip NDJSON chunks mein (month-wise)
+class QuestionHistoryArchive(Base):
+    __tablename__ = "question_history_archives"
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(String(7), nullable=False, index=True)  # YYYY-MM
+    first_id = Column(Integer, nullable=False)
+    last_id = Column(Integer, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)  # gzip(NDJSON)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# QUIZ SYSTEM MODELS
+class QuizAttempt(Base):
+    __tablename__ = "quiz_attempts"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    class_level = Column(Integer, nullable=False)
+    subject = Column(String(50), nullable=False)
+    chapter = Column(Integer, nullable=False)
+    total_questions = Column(Integer, default=0)
+    correct_answers = Column(Integer, default=0)
+    score_percentage = Column(Float, default=0)
+    time_taken = Column(Integer, default=0)
+    client_submission_id = Column(String(64))  # offline sync idempotency key
+    attempted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "client_submission_id", name="uq_quiz_attempts_client_submission"),
+    )
+
+class StudentResponse(Base):
+    __tablename__ = "student_responses"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    quiz_attempt_id = Column(Integer, nullable=False, index=True)
+    question_id = Column(Integer, nullable=False)
+    question_text = Column(Text, nullable=False)
+    selected_answer = Column(String(500))
+    correct_answer = Column(String(500), nullable=False)
+    is_correct = Column(Integer, default=0)
+    options = Column(Text)  # JSON as string
+
+# INCREMENTAL DIFFICULTY COUNTERS (submit_quiz ke transaction mein update hote hain)
+class QuestionStat(Base):
+    __tablename__ = "question_stats"
+    id = Column(Integer, primary_key=True, index=True)
+    question_hash = Column(String(40), unique=True, index=True, nullable=False)
+    class_level = Column(Integer, nullable=False)
+    subject = Column(String(50), nullable=False)
+    chapter = Column(Integer, nullable=False)
+    question_text = Column(Text, nullable=False)
+    options = Column(Text)  # JSON as string
+    correct_answer = Column(String(500), nullable=False)
+    language = Column(String(10), default="english", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    corrects = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_question_stats_chapter", "class_level", "subject", "chapter", "language"),
+    )
+
+class ChapterStat(Base):
+    __tablename__ = "chapter_stats"
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    class_level = Column(Integer, nullable=False)
+    subject = Column(String(50), nullable=False)
+    chapter = Column(Integer, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    corrects = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "class_level", "subject", "chapter", name="uq_chapter_stats_user_chapter"),
+    )
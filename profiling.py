@@ -0,0 +1,237 @@
+# profiling.py - OPT-IN PER-REQUEST PROFILING (ADMIN ONLY)
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+from auth import ADMIN_TOKEN, is_admin_token
+
+logger = logging.getLogger("question_ai.profiling")
+
+PROFILE_HEADER = "x-profile"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/question-ai-profiles")
+PROFILE_MAX_ARTIFACTS = int(os.getenv("PROFILE_MAX_ARTIFACTS", "20"))
+PROFILE_MAX_STACKS = 200
+SLOW_STATEMENTS_KEPT = 10
+
+_current_profile: ContextVar = ContextVar("current_profile", default=None)
+
+def should_profile(headers):
+    """Header (ya sampling) + valid admin token dono chahiye"""
+    if not is_admin_token(headers.get("x-admin-token")):
+        return False
+    if headers.get(PROFILE_HEADER) in ("1", "true"):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+class RequestProfile:
+    """
+    Ek request ka sampling profile + SQL stats.
+    Sampler sirf is request ke threads dekhta hai: event loop thread (body parsing,
+    serialization) aur woh threadpool threads jo abhi is request ka kaam
+    (endpoint, dependencies, admission wait) chala rahe hain.
+    """
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.stacks = Counter()
+        self.samples = 0
+        self.sql_count = 0
+        self.sql_total = 0.0
+        self.slow_statements = []
+        self._sql_lock = threading.Lock()
+        self._threads_lock = threading.Lock()
+        self._threads = Counter()  # thread ident -> is request ke chal rahe calls
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.enter_thread()  # middleware wala event loop thread
+        self._sampler.start()
+
+    def enter_thread(self):
+        with self._threads_lock:
+            self._threads[threading.get_ident()] += 1
+
+    def exit_thread(self):
+        ident = threading.get_ident()
+        with self._threads_lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def stop(self):
+        self.duration = time.perf_counter() - self.started
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample_loop(self):
+        while not self._stop.wait(PROFILE_INTERVAL):
+            with self._threads_lock:
+                thread_ids = list(self._threads)
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if stack:
+                    self.stacks[";".join(reversed(stack))] += 1
+                    self.samples += 1
+
+    def record_sql(self, statement, elapsed):
+        with self._sql_lock:
+            self.sql_count += 1
+            self.sql_total += elapsed
+            self.slow_statements.append((elapsed, statement))
+            self.slow_statements.sort(key=lambda s: s[0], reverse=True)
+            del self.slow_statements[SLOW_STATEMENTS_KEPT:]
+
+    def to_dict(self, request_id, status_code):
+        return {
+            "request_id": request_id,
+            "method": self.scope.get("method"),
+            "path": self.scope.get("path"),
+            "status_code": status_code,
+            "duration_ms": round(self.duration * 1000, 2),
+            "sample_interval_ms": PROFILE_INTERVAL * 1000,
+            "samples": self.samples,
+            "sql": {
+                "statements": self.sql_count,
+                "total_ms": round(self.sql_total * 1000, 2),
+                "slowest": [
+                    {"ms": round(elapsed * 1000, 2), "statement": statement[:500]}
+                    for elapsed, statement in self.slow_statements
+                ],
+            },
+            # collapsed-stack format (flamegraph.pl / speedscope compatible)
+            "stacks": dict(self.stacks.most_common(PROFILE_MAX_STACKS)),
+        }
+
+# ---- SQLAlchemy events: install_profiling mein ek baar register, contextvar se gated ----
+_listeners_installed = False
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    starts = conn.info.get("profile_query_start")
+    if starts:
+        profile.record_sql(statement, time.perf_counter() - starts.pop())
+
+def _install_sql_listeners(engine):
+    global _listeners_installed
+    if _listeners_installed:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    _listeners_installed = True
+
+def _track_worker_threads(run_sync):
+    """
+    anyio.to_thread.run_sync ka wrapper - FastAPI sync endpoints, dependencies aur
+    serialization isi se threadpool mein jaate hain. Profile active ho to worker
+    thread call ke dauraan us request ke profile mein registered rehta hai.
+    """
+    async def tracked_run_sync(func, *args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return await run_sync(func, *args, **kwargs)
+
+        def run_tracked(*call_args):
+            profile.enter_thread()
+            try:
+                return func(*call_args)
+            finally:
+                profile.exit_thread()
+
+        return await run_sync(run_tracked, *args, **kwargs)
+
+    tracked_run_sync.profiling_wrapped = True
+    return tracked_run_sync
+
+def begin_profile(scope):
+    profile = RequestProfile(scope)
+    token = _current_profile.set(profile)
+    profile.start()
+    return profile, token
+
+def end_profile(profile, token):
+    profile.stop()
+    _current_profile.reset(token)
+
+def write_artifact(profile, request_id, status_code):
+    """
+    PROFILE_DIR mein JSON artifact likhta hai; PROFILE_MAX_ARTIFACTS se zyada
+    hone par sabse purane delete (ring buffer). Artifact ka naam return karta hai.
+    """
+    safe_id = re.sub(r"[^A-Za-z0-9_-]", "", request_id)[:64] or "unknown"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{safe_id}.json"
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(profile.to_dict(request_id, status_code), f)
+        os.replace(tmp_path, path)
+
+        artifacts = sorted(
+            (entry for entry in os.scandir(PROFILE_DIR) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in artifacts[:-PROFILE_MAX_ARTIFACTS]:
+            os.remove(entry.path)
+        logger.info("Request profile written", extra={"fields": {"path": path}})
+        return name
+    except OSError as e:
+        logger.error("Profile artifact write failed: %s", e)
+        return None
+
+def install_profiling(app, engine):
+    """
+    ADMIN_TOKEN set na ho to middleware/listeners register hi nahi hote - zero overhead.
+    Token set ho to bhi bina profile wali requests par listeners sirf ek contextvar check.
+    """
+    if not ADMIN_TOKEN:
+        return
+    _install_sql_listeners(engine)
+
+    import anyio.to_thread
+    from starlette.concurrency import run_in_threadpool
+
+    if not getattr(anyio.to_thread.run_sync, "profiling_wrapped", False):
+        anyio.to_thread.run_sync = _track_worker_threads(anyio.to_thread.run_sync)
+
+    @app.middleware("http")
+    async def profiling_middleware(request, call_next):
+        if not should_profile(request.headers):
+            return await call_next(request)
+
+        profile, token = begin_profile(request.scope)
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            end_profile(profile, token)
+        request_id = response.headers.get("X-Request-ID") or request.headers.get("X-Request-ID", "unknown")
+        artifact = await run_in_threadpool(write_artifact, profile, request_id, status_code)
+        if artifact:
+            response.headers["X-Profile-Artifact"] = artifact
+        return response
@@ -0,0 +1,149 @@
+# response_cache.py - TTL + LRU CACHE WITH STALE-WHILE-REVALIDATE
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger("question_ai.response_cache")
+
+def cache_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class _Flight:
+    """Ek key ka chal raha load - followers isi ke event par wait karte hain"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class ResponseCache:
+    """
+    - age <= ttl: fresh, seedha serve ("hit")
+    - ttl < age <= ttl + stale_ttl: stale serve hota hai aur background mein
+      ek hi refresh chalta hai ("stale")
+    - usse purana ya missing: "miss" - caller load() se single-flight load kare
+    max_entries cross hone par least-recently-used entry evict hoti hai.
+    """
+
+    def __init__(self, name, max_entries, ttl, stale_ttl, refresh_workers=2, failure_backoff=60):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.failure_backoff = failure_backoff
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._refreshing = set()
+        self._refresh_failed_at = {}
+        self._loading = {}  # key -> _Flight (miss par single-flight)
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix=f"{name}-refresh")
+        self._hits = self._stale_hits = self._misses = self._refreshes = self._evictions = 0
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def lookup(self, key, refresher):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = time.time() - stored_at
+                if age <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value, "hit"
+                if age <= self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._stale_hits += 1
+                    self._schedule_refresh(key, refresher)
+                    return value, "stale"
+                del self._entries[key]
+            self._misses += 1
+            return None, "miss"
+
+    def _schedule_refresh(self, key, refresher):
+        # lock caller ke paas hai
+        if key in self._refreshing:
+            return
+        failed_at = self._refresh_failed_at.get(key)
+        if failed_at and time.time() - failed_at < self.failure_backoff:
+            return
+        self._refreshing.add(key)
+        self._executor.submit(self._refresh, key, refresher)
+
+    def _refresh(self, key, refresher):
+        try:
+            value = refresher()
+            self._store(key, value)
+            with self._lock:
+                self._refreshes += 1
+                self._refresh_failed_at.pop(key, None)
+        except Exception as e:
+            logger.warning("Background refresh failed: %s", e, extra={"fields": {"cache": self.name}})
+            with self._lock:
+                self._refresh_failed_at[key] = time.time()
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def load(self, key, loader, wait_timeout=30):
+        """
+        Miss par load - same key ke parallel misses mein sirf leader loader chalata hai,
+        baaki uska result (ya uski exception) use karenge. Loader fail ho to kuch
+        cache nahi hota. Admission jaisa kaam loader ke andar rakhein - followers
+        ke liye woh chalta hi nahi.
+        """
+        with self._lock:
+            # Pichla leader lookup() aur load() ke beech khatam ho chuka ho to
+            # uska fresh result use karein - dobara Gemini call nahi
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] <= self.ttl:
+                self._entries.move_to_end(key)
+                return entry[0]
+            flight = self._loading.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._loading[key] = _Flight()
+
+        if not leader:
+            if not flight.event.wait(wait_timeout):
+                raise TimeoutError(f"{self.name}: load for key still running after {wait_timeout}s")
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = flight.value = loader()
+            self._store(key, value)
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            flight.event.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "stale_ttl_seconds": self.stale_ttl,
+                "hits": self._hits,
+                "stale_hits": self._stale_hits,
+                "misses": self._misses,
+                "background_refreshes": self._refreshes,
+                "refreshing": len(self._refreshing),
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,194 @@
+# retention.py - QUESTION_HISTORY / USAGE_LIMITS RETENTION + COMPACTION JOB
+# Run: python retention.py  (render.yaml mein daily cron job)
+from collections import defaultdict
+from datetime import date, datetime, timedelta, time as dt_time
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+import gzip
+import json
+import logging
+import os
+import time
+
+from database import SessionLocal, engine
+from logging_config import setup_logging
+import models
+
+logger = logging.getLogger("question_ai.retention")
+
+USAGE_RETENTION_DAYS = int(os.getenv("USAGE_RETENTION_DAYS", "35"))
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "90"))
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+# Batches ke beech pause - live traffic ko locks ke liye jagah milti rahe
+RETENTION_BATCH_PAUSE = float(os.getenv("RETENTION_BATCH_PAUSE", "0.2"))
+RETENTION_LOCK_ID = 804211  # pg advisory lock - ek time par ek hi job
+
+def _is_postgres():
+    return engine.dialect.name == "postgresql"
+
+def _begin_batch(db: Session):
+    """Har batch ek chhota transaction; postgres par lock wait bhi bounded"""
+    if _is_postgres():
+        db.execute(text("SET LOCAL lock_timeout = '2s'"))
+
+def ensure_indexes():
+    """
+    create_all purani tables par naye indexes nahi banata, isliye yahan explicitly.
+    Postgres par CONCURRENTLY - live writes block nahi hote.
+    """
+    if _is_postgres():
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_question_history_generated_at "
+                "ON question_history (generated_at)"
+            ))
+    else:
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_question_history_generated_at "
+                "ON question_history (generated_at)"
+            ))
+
+def _month_start(day):
+    return day.replace(day=1)
+
+def compact_usage_limits(db: Session, cutoff: date):
+    """
+    cutoff se purane usage_limits rows ko (user, subject, month) summaries mein
+    add karke delete karta hai. Summary update aur delete ek hi transaction mein.
+    """
+    total = 0
+    while True:
+        _begin_batch(db)
+        rows = db.query(models.UsageLimit).filter(
+            models.UsageLimit.last_used_date < cutoff
+        ).order_by(models.UsageLimit.id).limit(RETENTION_BATCH_SIZE).with_for_update(skip_locked=True).all()
+        if not rows:
+            db.rollback()
+            break
+
+        rollup = defaultdict(lambda: [0, 0])
+        for row in rows:
+            entry = rollup[(row.user_id, row.subject, _month_start(row.last_used_date))]
+            entry[0] += 1
+            entry[1] += row.questions_generated_today or 0
+
+        for (user_id, subject, month), (days, questions) in rollup.items():
+            updated = db.query(models.UsageMonthlySummary).filter(
+                models.UsageMonthlySummary.user_id == user_id,
+                models.UsageMonthlySummary.subject == subject,
+                models.UsageMonthlySummary.month == month
+            ).update({
+                models.UsageMonthlySummary.days_used: models.UsageMonthlySummary.days_used + days,
+                models.UsageMonthlySummary.questions_generated: models.UsageMonthlySummary.questions_generated + questions
+            }, synchronize_session=False)
+            if not updated:
+                db.add(models.UsageMonthlySummary(
+                    user_id=user_id,
+                    subject=subject,
+                    month=month,
+                    days_used=days,
+                    questions_generated=questions
+                ))
+
+        db.query(models.UsageLimit).filter(
+            models.UsageLimit.id.in_([row.id for row in rows])
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        total += len(rows)
+        time.sleep(RETENTION_BATCH_PAUSE)
+    return total
+
+def _history_record(row):
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "class_level": row.class_level,
+        "subject": row.subject,
+        "chapter": row.chapter,
+        "question_text": row.question_text,
+        "options": row.options,
+        "correct_answer": row.correct_answer,
+        "difficulty": row.difficulty,
+        "language": row.language,
+        "generated_at": row.generated_at.isoformat() if row.generated_at else None
+    }
+
+def archive_question_history(db: Session, cutoff: date):
+    """
+    cutoff se purani question_history ko question_history_archives table mein
+    month-wise gzip NDJSON chunks banakar delete karta hai.
+    Archive insert aur delete ek hi transaction mein - na data lose, na duplicate.
+    (Cron container ki disk temporary hai, isliye files nahi.)
+    /export/question-history archived chunks bhi padhta hai; class report ka text
+    question_stats se aata hai - dono par retention ka asar nahi.
+    """
+    cutoff_ts = datetime.combine(cutoff, dt_time.min)
+    total = 0
+    while True:
+        _begin_batch(db)
+        rows = db.query(models.QuestionHistory).filter(
+            models.QuestionHistory.generated_at < cutoff_ts
+        ).order_by(models.QuestionHistory.id).limit(RETENTION_BATCH_SIZE).with_for_update(skip_locked=True).all()
+        if not rows:
+            db.rollback()
+            break
+
+        by_month = defaultdict(list)
+        for row in rows:
+            by_month[row.generated_at.strftime("%Y-%m")].append(row)
+
+        for month, month_rows in by_month.items():
+            ndjson = "".join(
+                json.dumps(_history_record(row), ensure_ascii=False) + "\n" for row in month_rows
+            )
+            db.add(models.QuestionHistoryArchive(
+                month=month,
+                first_id=month_rows[0].id,
+                last_id=month_rows[-1].id,
+                row_count=len(month_rows),
+                payload=gzip.compress(ndjson.encode("utf-8"))
+            ))
+
+        db.query(models.QuestionHistory).filter(
+            models.QuestionHistory.id.in_([row.id for row in rows])
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        total += len(rows)
+        time.sleep(RETENTION_BATCH_PAUSE)
+    return total
+
+def run_retention():
+    today = date.today()
+    # Advisory lock session-level hai, isliye alag dedicated connection par
+    lock_conn = engine.connect() if _is_postgres() else None
+    db = SessionLocal()
+    locked = False
+    try:
+        if lock_conn is not None:
+            locked = lock_conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": RETENTION_LOCK_ID}).scalar()
+            lock_conn.commit()
+            if not locked:
+                logger.warning("Retention job already running elsewhere - skipping")
+                return {"skipped": True}
+
+        ensure_indexes()
+        usage_rows = compact_usage_limits(db, today - timedelta(days=USAGE_RETENTION_DAYS))
+        history_rows = archive_question_history(db, today - timedelta(days=HISTORY_RETENTION_DAYS))
+        result = {"usage_limits_compacted": usage_rows, "question_history_archived": history_rows}
+        logger.info("Retention job finished", extra={"fields": result})
+        return result
+    finally:
+        db.close()
+        if lock_conn is not None:
+            if locked:
+                lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": RETENTION_LOCK_ID})
+                lock_conn.commit()
+            lock_conn.close()
+
+if __name__ == "__main__":
+    setup_logging()
+    models.Base.metadata.create_all(bind=engine)
+    print(json.dumps(run_retention()))
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -70,6 +70,29 @@ class QuizSubmission(BaseModel):
     questions: List[Dict[str, Any]]  # Original questions with IDs
     answers: List[StudentAnswer]
     time_taken: int = 0
+    language: str = "english"
+
+# OFFLINE SYNC - client_submission_id se retries idempotent rehte hain
+class SyncQuizSubmission(QuizSubmission):
+    client_submission_id: str = Field(min_length=1, max_length=64)  # quiz_attempts column String(64)
+
+class QuizSyncRequest(BaseModel):
+    submissions: List[SyncQuizSubmission]
+
+class QuizSyncItemResult(BaseModel):
+    client_submission_id: str
+    status: str  # created / duplicate / error
+    quiz_id: Optional[int] = None
+    total_questions: Optional[int] = None
+    correct_answers: Optional[int] = None
+    score_percentage: Optional[float] = None
+    error: Optional[str] = None
+
+class QuizSyncResponse(BaseModel):
+    synced: int
+    duplicates: int
+    errors: int
+    results: List[QuizSyncItemResult]
 
 class QuizResult(BaseModel):
     quiz_id: int
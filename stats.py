@@ -0,0 +1,224 @@
+# stats.py - INCREMENTAL DIFFICULTY / WEAK-CHAPTER COUNTERS
+from sqlalchemy import func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+import hashlib
+import json
+
+import models
+
+# Itne attempts se kam ho to empirical difficulty reliable nahi maante
+MIN_ATTEMPTS_FOR_DIFFICULTY = 5
+WEAK_CHAPTER_ACCURACY = 0.6
+
+# difficulty -> (min success rate, max success rate, target)
+DIFFICULTY_BANDS = {
+    "easy": (0.75, 1.01, 0.85),
+    "medium": (0.4, 0.75, 0.6),
+    "hard": (0.0, 0.4, 0.3),
+}
+
+def question_hash(class_level, subject, chapter, question_text):
+    """Same chapter ka same question (kisi bhi user ke liye) ek hi counter use kare"""
+    key = f"{class_level}|{subject.lower()}|{chapter}|{question_text.strip().lower()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def empirical_difficulty(attempts, corrects):
+    if attempts < MIN_ATTEMPTS_FOR_DIFFICULTY:
+        return None
+    rate = corrects / attempts
+    for label, (low, high, _) in DIFFICULTY_BANDS.items():
+        if low <= rate < high:
+            return label
+    return None
+
+# generate_sample_questions_from_subject ke placeholders - inke counters nahi bante
+SAMPLE_QUESTION_PREFIX = "Sample question"
+PLACEHOLDER_OPTIONS = ["Option A", "Option B", "Option C", "Option D"]
+
+def is_sample_question(question_text, options):
+    return question_text.startswith(SAMPLE_QUESTION_PREFIX) or options == PLACEHOLDER_OPTIONS
+
+def _update_then_insert_counters(db: Session, model, values, conflict_columns):
+    """
+    Portable fallback (bina ON CONFLICT wale databases): pehle UPDATE, row na mile
+    to savepoint mein INSERT; parallel insert jeet jaye to dobara UPDATE.
+    """
+    def increment():
+        return db.query(model).filter(
+            *(getattr(model, column) == values[column] for column in conflict_columns)
+        ).update({
+            model.attempts: model.attempts + values["attempts"],
+            model.corrects: model.corrects + values["corrects"],
+            model.updated_at: func.now()
+        }, synchronize_session=False)
+
+    if increment():
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(model).values(**values))
+    except IntegrityError:
+        increment()
+
+def _upsert_counters(db: Session, model, values, conflict_columns):
+    """
+    INSERT ... ON CONFLICT DO UPDATE - parallel submits bhi ek hi row
+    atomically badhate hain (select-then-insert wali race nahi).
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        _update_then_insert_counters(db, model, values, conflict_columns)
+        return
+
+    stmt = dialect_insert(model).values(**values)
+    table = model.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=conflict_columns,
+        set_={
+            "attempts": table.c.attempts + stmt.excluded.attempts,
+            "corrects": table.c.corrects + stmt.excluded.corrects,
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt)
+
+def collect_quiz_stats(deltas, user_id: int, class_level: int, subject: str, chapter: int,
+                       detailed_results, language: str = "english"):
+    """
+    Ek quiz ke results ko deltas dict mein merge karta hai:
+    {"questions": {hash: {...}}, "chapters": {(user, class, subject, chapter): [attempts, corrects]}}
+    Sample / placeholder questions skip hote hain.
+    """
+    questions = deltas.setdefault("questions", {})
+    chapters = deltas.setdefault("chapters", {})
+    for result in detailed_results:
+        if is_sample_question(result["question_text"], result["options"]):
+            continue
+        correct = 1 if result["is_correct"] else 0
+        h = question_hash(class_level, subject, chapter, result["question_text"])
+        entry = questions.get(h)
+        if entry is None:
+            entry = questions[h] = {
+                "question_hash": h,
+                "class_level": class_level,
+                "subject": subject,
+                "chapter": chapter,
+                "language": language,
+                "question_text": result["question_text"],
+                "options": json.dumps(result["options"]),
+                "correct_answer": result["correct_answer"],
+                "attempts": 0,
+                "corrects": 0
+            }
+        entry["attempts"] += 1
+        entry["corrects"] += correct
+
+        counters = chapters.setdefault((user_id, class_level, subject, chapter), [0, 0])
+        counters[0] += 1
+        counters[1] += correct
+    return deltas
+
+def apply_quiz_stats(db: Session, deltas):
+    """Har key ke liye ek upsert; sorted order taaki parallel transactions deadlock na karein"""
+    for h in sorted(deltas.get("questions", {})):
+        _upsert_counters(db, models.QuestionStat, deltas["questions"][h], ["question_hash"])
+
+    for key in sorted(deltas.get("chapters", {})):
+        user_id, class_level, subject, chapter = key
+        attempts, corrects = deltas["chapters"][key]
+        _upsert_counters(db, models.ChapterStat, {
+            "user_id": user_id,
+            "class_level": class_level,
+            "subject": subject,
+            "chapter": chapter,
+            "attempts": attempts,
+            "corrects": corrects
+        }, ["user_id", "class_level", "subject", "chapter"])
+
+def record_quiz_stats(db: Session, user_id: int, class_level: int, subject: str, chapter: int,
+                      detailed_results, language: str = "english"):
+    """
+    Quiz ke results se per-question aur per-chapter counters badhata hai.
+    Commit caller karega - taaki ye submit_quiz ke same transaction mein rahe.
+    """
+    deltas = collect_quiz_stats({}, user_id, class_level, subject, chapter, detailed_results, language)
+    apply_quiz_stats(db, deltas)
+
+def get_weak_chapters(db: Session, user_id: int, subject: str = None):
+    """User ke chapter counters - sabse kam accuracy wale pehle"""
+    query = db.query(models.ChapterStat).filter(models.ChapterStat.user_id == user_id)
+    if subject:
+        query = query.filter(models.ChapterStat.subject == subject)
+
+    chapters = []
+    for stat in query.all():
+        accuracy = stat.corrects / stat.attempts if stat.attempts else 0
+        chapters.append({
+            "class_level": stat.class_level,
+            "subject": stat.subject,
+            "chapter": stat.chapter,
+            "attempts": stat.attempts,
+            "corrects": stat.corrects,
+            "accuracy": round(accuracy * 100, 2),
+            "is_weak": stat.attempts >= MIN_ATTEMPTS_FOR_DIFFICULTY and accuracy < WEAK_CHAPTER_ACCURACY
+        })
+    chapters.sort(key=lambda c: c["accuracy"])
+    return chapters
+
+def get_question_difficulty(db: Session, class_level: int, subject: str, chapter: int, limit: int = 100):
+    stats = db.query(models.QuestionStat).filter(
+        models.QuestionStat.class_level == class_level,
+        models.QuestionStat.subject == subject,
+        models.QuestionStat.chapter == chapter
+    ).order_by(models.QuestionStat.attempts.desc()).limit(limit).all()
+
+    return [{
+        "question": s.question_text,
+        "attempts": s.attempts,
+        "corrects": s.corrects,
+        "success_rate": round(s.corrects / s.attempts * 100, 2) if s.attempts else None,
+        "empirical_difficulty": empirical_difficulty(s.attempts, s.corrects)
+    } for s in stats]
+
+def pick_bank_questions(db: Session, class_level: int, subject: str, chapter: int, difficulty: str,
+                        count: int, language: str = "english"):
+    """
+    Question bank (question_stats) se target difficulty ke kareeb wale questions.
+    Pehle calibrated questions jo band mein hain, phir baaki chapter questions.
+    """
+    low, high, target = DIFFICULTY_BANDS.get(difficulty, DIFFICULTY_BANDS["medium"])
+    stat = models.QuestionStat
+    rate = stat.corrects * 1.0 / stat.attempts
+    chapter_filter = (
+        stat.class_level == class_level,
+        stat.subject == subject,
+        stat.chapter == chapter,
+        stat.language == language,
+        # Purane data mein bache placeholders bhi bank mein na aayein
+        ~stat.question_text.startswith(SAMPLE_QUESTION_PREFIX)
+    )
+
+    picked = db.query(stat).filter(
+        *chapter_filter,
+        stat.attempts >= MIN_ATTEMPTS_FOR_DIFFICULTY,
+        rate >= low,
+        rate < high
+    ).order_by(func.abs(rate - target)).limit(count).all()
+
+    if len(picked) < count:
+        picked_ids = [s.id for s in picked]
+        filler = db.query(stat).filter(*chapter_filter)
+        if picked_ids:
+            filler = filler.filter(stat.id.notin_(picked_ids))
+        picked += filler.order_by(stat.attempts.desc()).limit(count - len(picked)).all()
+
+    return [{
+        "question": s.question_text,
+        "options": json.loads(s.options) if s.options else [],
+        "correct_answer": s.correct_answer
+    } for s in picked]
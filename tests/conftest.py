@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# database.py import time par hi engine banata hai - isliye pehle env set karein
+_tmp_dir = tempfile.mkdtemp(prefix="question-ai-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}")
+os.environ.setdefault("CONTENT_STORE_DIR", os.path.join(_tmp_dir, "content"))
+os.environ.setdefault("LEADERBOARD_REBUILD_SECONDS", "0")
+os.environ.setdefault("ADMIN_TOKEN", "test-admin-token")
+os.environ.setdefault("PROFILE_DIR", os.path.join(_tmp_dir, "profiles"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+import models  # noqa: E402
+from auth import create_access_token  # noqa: E402
+from database import SessionLocal  # noqa: E402
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def auth_headers(db):
+    user = models.User(email=f"user{os.urandom(4).hex()}@example.com", password="test123")
+    db.add(user)
+    db.commit()
+    token = create_access_token({"user_id": user.id})
+    return {"Authorization": f"Bearer {token}"}, user.id
+
+def make_questions(prefix, count, start_id=1):
+    """Gemini jaise (non-placeholder) questions"""
+    return [{
+        "id": start_id + i,
+        "question": f"{prefix} question {i + 1}?",
+        "options": [f"{prefix} ans {i}-{j}" for j in range(4)],
+        "correct_answer": f"{prefix} ans {i}-0"
+    } for i in range(count)]
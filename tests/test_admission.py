@@ -0,0 +1,58 @@
+import threading
+import time
+
+from fastapi import HTTPException
+
+from admission import AdmissionController
+
+def test_released_slot_goes_to_oldest_waiter():
+    admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=1)
+    order = []
+
+    def worker(name):
+        try:
+            admission.acquire()
+        except HTTPException:
+            order.append(f"{name}-503")
+            return
+        order.append(name)
+        time.sleep(0.05)
+        admission.release()
+
+    admission.acquire()
+    old = threading.Thread(target=worker, args=("old",))
+    old.start()
+    while admission.stats()["queue_depth"] == 0:
+        time.sleep(0.001)
+
+    # Slot free hote hi naya request aaye - phir bhi queue wala pehle jaye
+    admission.release()
+    worker("new")
+    old.join()
+
+    assert order == ["old", "new"]
+    assert admission.stats()["in_flight"] == 0
+
+def test_queue_full_and_timeout_reject_with_503():
+    admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    admission.acquire()
+    errors = []
+
+    def worker():
+        try:
+            admission.acquire()
+        except HTTPException as e:
+            errors.append(e.detail)
+
+    waiter = threading.Thread(target=worker)
+    waiter.start()
+    while admission.stats()["queue_depth"] == 0:
+        time.sleep(0.001)
+    worker()
+    waiter.join()
+
+    assert any("queue full" in e for e in errors)
+    assert any("queue timeout" in e for e in errors)
+    assert admission.stats()["queue_depth"] == 0
+    admission.release()
+    assert admission.stats()["in_flight"] == 0
@@ -0,0 +1,31 @@
+from conftest import create_access_token, make_questions
+import analytics
+import models
+
+def test_class_report_groups_same_question_across_students(client, db):
+    questions = make_questions("class-report", 3)
+    # Har student ke liye alag question_history ids - jaise /generate-from-chapter deta hai
+    for student in range(6):
+        user = models.User(email=f"class-report-{student}@example.com", password="test123")
+        db.add(user)
+        db.commit()
+        headers = {"Authorization": f"Bearer {create_access_token({'user_id': user.id})}"}
+        own_questions = [dict(q, id=1000 * (student + 1) + i) for i, q in enumerate(questions)]
+        answers = [{
+            "question_id": q["id"],
+            # Pehla question sirf do students sahi karte hain
+            "selected_answer": q["correct_answer"] if i or student < 2 else q["options"][1]
+        } for i, q in enumerate(own_questions)]
+        response = client.post("/submit-quiz", json={
+            "class_level": 7, "subject": "physics", "chapter": 2,
+            "questions": own_questions, "answers": answers, "time_taken": 60
+        }, headers=headers)
+        assert response.status_code == 200
+
+    analytics._snapshots.clear()
+    report = analytics.class_report(db, 7, "physics", chapter=2, min_attempts=2)
+    assert report["total_responses"] == 18
+    hardest = report["hardest_questions"]
+    assert len(hardest) == 3
+    assert hardest[0]["question"] == "class-report question 1?"
+    assert (hardest[0]["attempts"], hardest[0]["success_rate"]) == (6, 33.33)
@@ -0,0 +1,34 @@
+import time
+
+from circuit_breaker import CircuitBreaker
+
+def _open_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=0.5, window=4, min_calls=2, reset_timeout=0.05)
+    for _ in range(2):
+        breaker.record_failure(breaker.allow(), RuntimeError("down"))
+    assert breaker.state == "open"
+    return breaker
+
+def test_slow_call_from_closed_state_cannot_steal_half_open_result():
+    breaker = CircuitBreaker("test", failure_threshold=0.5, window=4, min_calls=2, reset_timeout=0.05)
+    slow_call = breaker.allow()  # breaker closed tha jab ye shuru hui
+    for _ in range(2):
+        breaker.record_failure(breaker.allow(), RuntimeError("down"))
+    time.sleep(0.06)
+
+    probe = breaker.allow()
+    assert probe is not None and breaker.allow() is None
+    breaker.record_failure(slow_call, RuntimeError("timeout"))
+    assert breaker.state == "half_open"
+
+    breaker.record_success(probe)
+    assert breaker.state == "closed"
+
+def test_probe_failure_reopens():
+    breaker = _open_breaker()
+    assert breaker.allow() is None
+    time.sleep(0.06)
+    probe = breaker.allow()
+    breaker.record_failure(probe, RuntimeError("still down"))
+    assert breaker.state == "open"
+    assert breaker.allow() is None
@@ -0,0 +1,65 @@
+from leaderboard import LeaderboardRegistry
+import leaderboard
+import models
+
+class _Rows:
+    """Rebuild query jaisa iterable - beech mein ek naya submit aata hai"""
+
+    def __init__(self, rows, during):
+        self.rows = rows
+        self.during = during
+
+    def filter(self, *criteria):
+        return self
+
+    def execution_options(self, **kwargs):
+        return self
+
+    def __iter__(self):
+        for i, row in enumerate(self.rows):
+            if i == 1:
+                self.during()
+            yield row
+
+class _FakeDb:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def query(self, *columns):
+        return self.rows
+
+def test_rebuild_keeps_attempts_recorded_while_it_runs():
+    registry = LeaderboardRegistry()
+    rows = _Rows(
+        [(1, 9, "physics", 1, 1, 80.0, 100), (2, 9, "physics", 1, 2, 60.0, 100)],
+        during=lambda: registry.record(9, "physics", 1, 3, 90.0, 50)
+    )
+    registry.rebuild(_FakeDb(rows))
+
+    total, top, my_rank = registry.snapshot(9, "physics", 1, 3, 10)
+    assert total == 3
+    assert [entry["user_id"] for entry in top] == [3, 1, 2]
+    assert my_rank["rank"] == 1
+
+def _attempt(db, user_id, score, total_questions=10):
+    db.add(models.QuizAttempt(
+        user_id=user_id, class_level=6, subject="biology", chapter=1,
+        total_questions=total_questions, correct_answers=0,
+        score_percentage=score, time_taken=30
+    ))
+    db.commit()
+
+def test_refresh_merges_only_new_attempts_and_skips_empty_quizzes(db, monkeypatch):
+    monkeypatch.setattr(leaderboard, "LEADERBOARD_REFRESH_OVERLAP", 0)
+    registry = LeaderboardRegistry()
+    _attempt(db, 1, 70.0)
+    _attempt(db, 2, 0.0, total_questions=0)
+    registry.rebuild(db)
+    assert registry.snapshot(6, "biology", 1, 2, 10)[0] == 1
+
+    _attempt(db, 3, 90.0)  # dusre worker ka submit
+    assert registry.refresh(db) == 1
+    assert registry.refresh(db) == 0
+    total, top, _ = registry.snapshot(6, "biology", 1, 3, 10)
+    assert total == 2
+    assert [entry["user_id"] for entry in top] == [3, 1]
@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from database import engine
+import profiling
+
+def slow_dependency():
+    time.sleep(0.15)
+
+def busy_elsewhere():
+    time.sleep(0.3)
+
+def _app():
+    app = FastAPI()
+    profiling.install_profiling(app, engine)
+
+    @app.get("/profiled")
+    def profiled(_slow: None = Depends(slow_dependency)):
+        return {"ok": True}
+
+    @app.get("/profiled-sql")
+    def profiled_sql():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return {"ok": True}
+
+    @app.get("/other")
+    def other():
+        busy_elsewhere()
+        return {"ok": True}
+
+    return app
+
+def test_profile_samples_dependencies_but_not_other_requests():
+    with TestClient(_app()) as client:
+        other = threading.Thread(target=client.get, args=("/other",))
+        other.start()
+        time.sleep(0.05)
+        response = client.get("/profiled", headers={"x-admin-token": "test-admin-token", "x-profile": "1"})
+        other.join()
+
+    artifact = response.headers["X-Profile-Artifact"]
+    with open(os.path.join(profiling.PROFILE_DIR, artifact)) as f:
+        stacks = json.load(f)["stacks"]
+    assert any("slow_dependency" in stack for stack in stacks)
+    assert not any("busy_elsewhere" in stack for stack in stacks)
+
+def test_sql_listeners_registered_once_and_gated_by_profile():
+    with TestClient(_app()) as client:
+        client.get("/profiled-sql")
+        response = client.get("/profiled-sql", headers={"x-admin-token": "test-admin-token", "x-profile": "1"})
+
+    assert event.contains(engine, "before_cursor_execute", profiling._before_cursor_execute)
+    with open(os.path.join(profiling.PROFILE_DIR, response.headers["X-Profile-Artifact"])) as f:
+        sql = json.load(f)["sql"]
+    assert sql["statements"] == 1
+    assert sql["slowest"][0]["statement"] == "SELECT 1"
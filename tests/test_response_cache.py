@@ -0,0 +1,90 @@
+import threading
+import time
+
+from admission import AdmissionController
+from response_cache import ResponseCache
+
+def test_concurrent_misses_load_once_even_after_leader_finished():
+    cache = ResponseCache("test", max_entries=10, ttl=60, stale_ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "questions"
+
+    # Sab requests pehle miss dekhti hain, phir alag-alag samay par load() tak pahunchti hain
+    misses = [cache.lookup("key", loader) for _ in range(8)]
+    assert all(status == "miss" for _, status in misses)
+
+    results = []
+    def worker(delay):
+        time.sleep(delay)
+        results.append(cache.load("key", loader))
+
+    threads = [threading.Thread(target=worker, args=(i * 0.03,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["questions"] * 8
+    assert len(calls) == 1
+
+def test_stale_entry_refreshes_in_background_once():
+    cache = ResponseCache("test", max_entries=10, ttl=0.3, stale_ttl=10)
+    calls = []
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    cache.load("key", loader)
+    time.sleep(0.35)
+    assert cache.lookup("key", loader) == (1, "stale")
+    assert cache.lookup("key", loader) == (1, "stale")
+    time.sleep(0.05)
+    assert cache.lookup("key", loader) == (2, "hit")
+    assert len(calls) == 2
+
+def _run_concurrently(func, count=8):
+    results = []
+    def worker():
+        try:
+            results.append(func())
+        except Exception as e:
+            results.append(e)
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+def test_leader_failure_is_shared_with_followers():
+    cache = ResponseCache("test", max_entries=10, ttl=60, stale_ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("gemini down")
+
+    results = _run_concurrently(lambda: cache.load("key", loader))
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_only_leader_takes_admission_slot():
+    admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+    cache = ResponseCache("test", max_entries=10, ttl=60, stale_ttl=60)
+
+    def loader():
+        admission.acquire()
+        try:
+            time.sleep(0.1)
+            return "questions"
+        finally:
+            admission.release()
+
+    results = _run_concurrently(lambda: cache.load("key", loader))
+    assert results == ["questions"] * 8
+    assert admission.stats()["admitted"] == 1
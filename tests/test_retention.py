@@ -0,0 +1,65 @@
+from datetime import date, datetime, timedelta
+import gzip
+import json
+
+from sqlalchemy import inspect
+
+from database import engine
+import models
+import retention
+
+def test_archive_moves_old_history_into_archive_table(db, monkeypatch):
+    monkeypatch.setattr(retention, "RETENTION_BATCH_PAUSE", 0)
+    old = datetime(2020, 1, 15, 10, 0)
+    for i in range(3):
+        db.add(models.QuestionHistory(
+            user_id=999, class_level=9, subject="maths", chapter=1,
+            question_text=f"old question {i}?", options=json.dumps(["a", "b"]),
+            correct_answer="a", generated_at=old
+        ))
+    db.add(models.QuestionHistory(
+        user_id=999, class_level=9, subject="maths", chapter=1,
+        question_text="recent question?", options=json.dumps(["a", "b"]), correct_answer="a"
+    ))
+    db.commit()
+
+    archived = retention.archive_question_history(db, date.today() - timedelta(days=30))
+
+    assert archived == 3
+    remaining = db.query(models.QuestionHistory).filter(models.QuestionHistory.user_id == 999).all()
+    assert [r.question_text for r in remaining] == ["recent question?"]
+    archive = db.query(models.QuestionHistoryArchive).filter(
+        models.QuestionHistoryArchive.month == "2020-01"
+    ).one()
+    records = [json.loads(line) for line in gzip.decompress(archive.payload).decode().splitlines()]
+    assert archive.row_count == 3
+    assert [r["question_text"] for r in records] == ["old question 0?", "old question 1?", "old question 2?"]
+
+def test_ensure_indexes_creates_generated_at_index():
+    retention.ensure_indexes()
+    names = {ix["name"] for ix in inspect(engine).get_indexes("question_history")}
+    assert "ix_question_history_generated_at" in names
+
+def test_export_includes_archived_history(client, auth_headers, db, monkeypatch):
+    headers, user_id = auth_headers
+    monkeypatch.setattr(retention, "RETENTION_BATCH_PAUSE", 0)
+    db.add(models.QuestionHistory(
+        user_id=user_id, class_level=8, subject="maths", chapter=2,
+        question_text="archived question?", options=json.dumps(["a", "b"]),
+        correct_answer="a", generated_at=datetime(2021, 3, 1, 9, 0)
+    ))
+    db.add(models.QuestionHistory(
+        user_id=user_id, class_level=8, subject="maths", chapter=2,
+        question_text="live question?", options=json.dumps(["a", "b"]), correct_answer="a"
+    ))
+    db.commit()
+    retention.archive_question_history(db, date.today() - timedelta(days=30))
+
+    response = client.get("/export/question-history", headers=headers)
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["question_text"] for r in rows] == ["archived question?", "live question?"]
+    assert rows[0]["options"] == ["a", "b"]
+
+    response = client.get("/export/question-history?start_date=2022-01-01", headers=headers)
+    assert [json.loads(line)["question_text"] for line in response.text.splitlines()] == ["live question?"]
@@ -0,0 +1,72 @@
+from conftest import make_questions
+import models
+import stats
+
+def _submission(questions, chapter, language="english"):
+    return {
+        "class_level": 9,
+        "subject": "physics",
+        "chapter": chapter,
+        "language": language,
+        "questions": questions,
+        "answers": [{"question_id": q["id"], "selected_answer": q["correct_answer"]} for q in questions],
+        "time_taken": 60
+    }
+
+def test_submit_quiz_upserts_counters_and_skips_placeholders(client, auth_headers, db):
+    headers, user_id = auth_headers
+    questions = make_questions("stats", 2)
+    placeholders = [{
+        "id": 50,
+        "question": "Sample question 1 for general?",
+        "options": ["Option A", "Option B", "Option C", "Option D"],
+        "correct_answer": "Option A"
+    }]
+
+    for _ in range(2):
+        response = client.post("/submit-quiz", json=_submission(questions + placeholders, 3), headers=headers)
+        assert response.status_code == 200
+
+    rows = db.query(models.QuestionStat).filter(models.QuestionStat.chapter == 3).all()
+    assert sorted((r.question_text, r.attempts, r.corrects) for r in rows) == [
+        ("stats question 1?", 2, 2),
+        ("stats question 2?", 2, 2),
+    ]
+    chapter_stat = db.query(models.ChapterStat).filter(
+        models.ChapterStat.user_id == user_id, models.ChapterStat.chapter == 3
+    ).one()
+    assert (chapter_stat.attempts, chapter_stat.corrects) == (4, 4)
+
+def test_bank_filters_by_language(client, auth_headers, db):
+    headers, _ = auth_headers
+    client.post("/submit-quiz", json=_submission(make_questions("hindi", 2), 4, "hindi"), headers=headers)
+    client.post("/submit-quiz", json=_submission(make_questions("english", 3), 4), headers=headers)
+
+    picked = stats.pick_bank_questions(db, 9, "physics", 4, "medium", 10, "hindi")
+    assert sorted(q["question"] for q in picked) == ["hindi question 1?", "hindi question 2?"]
+
+def test_generate_keeps_partial_bank_and_tops_up(client, auth_headers):
+    headers, _ = auth_headers
+    client.post("/submit-quiz", json=_submission(make_questions("bank", 2), 5), headers=headers)
+
+    response = client.post("/generate-from-chapter", json={
+        "class_level": 9, "subject": "physics", "chapter": 5, "question_count": 5
+    }, headers=headers)
+    assert response.status_code == 200
+    texts = [q["question"] for q in response.json()["questions"]]
+    assert len(texts) == 5
+    assert sorted(texts[:2]) == ["bank question 1?", "bank question 2?"]
+    assert all(t.startswith(stats.SAMPLE_QUESTION_PREFIX) for t in texts[2:])
+
+def test_portable_counter_fallback_inserts_then_increments(db):
+    values = {
+        "user_id": 4242, "class_level": 9, "subject": "physics", "chapter": 9,
+        "attempts": 3, "corrects": 2
+    }
+    conflict = ["user_id", "class_level", "subject", "chapter"]
+    stats._update_then_insert_counters(db, models.ChapterStat, dict(values), conflict)
+    stats._update_then_insert_counters(db, models.ChapterStat, dict(values), conflict)
+    db.commit()
+
+    row = db.query(models.ChapterStat).filter(models.ChapterStat.user_id == 4242).one()
+    assert (row.attempts, row.corrects) == (6, 4)
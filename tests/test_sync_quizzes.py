@@ -0,0 +1,57 @@
+from conftest import make_questions
+import models
+
+def _submission(client_id, questions, chapter=7):
+    return {
+        "client_submission_id": client_id,
+        "class_level": 10,
+        "subject": "chemistry",
+        "chapter": chapter,
+        "questions": questions,
+        "answers": [{"question_id": q["id"], "selected_answer": q["correct_answer"]} for q in questions],
+        "time_taken": 45
+    }
+
+def test_sync_two_submissions_same_new_chapter(client, auth_headers, db):
+    headers, user_id = auth_headers
+    questions = make_questions("sync", 3)
+    response = client.post("/sync-quizzes", json={"submissions": [
+        _submission("offline-1", questions),
+        _submission("offline-2", questions),
+    ]}, headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["synced"] == 2
+    assert [r["status"] for r in body["results"]] == ["created", "created"]
+
+    chapter_stat = db.query(models.ChapterStat).filter(
+        models.ChapterStat.user_id == user_id,
+        models.ChapterStat.class_level == 10,
+        models.ChapterStat.chapter == 7
+    ).one()
+    assert (chapter_stat.attempts, chapter_stat.corrects) == (6, 6)
+    question_stat = db.query(models.QuestionStat).filter(
+        models.QuestionStat.question_text == "sync question 1?"
+    ).one()
+    assert question_stat.attempts == 2
+
+def test_sync_retry_is_idempotent(client, auth_headers, db):
+    headers, user_id = auth_headers
+    payload = {"submissions": [_submission("retry-1", make_questions("retry", 2), chapter=8)]}
+    first = client.post("/sync-quizzes", json=payload, headers=headers).json()
+    second = client.post("/sync-quizzes", json=payload, headers=headers).json()
+
+    assert first["results"][0]["status"] == "created"
+    assert second["results"][0]["status"] == "duplicate"
+    assert second["results"][0]["quiz_id"] == first["results"][0]["quiz_id"]
+    assert db.query(models.QuizAttempt).filter(
+        models.QuizAttempt.user_id == user_id, models.QuizAttempt.chapter == 8
+    ).count() == 1
+
+def test_sync_rejects_overlong_client_submission_id(client, auth_headers):
+    headers, _ = auth_headers
+    response = client.post("/sync-quizzes", json={"submissions": [
+        _submission("x" * 65, make_questions("long-id", 1))
+    ]}, headers=headers)
+    assert response.status_code == 422